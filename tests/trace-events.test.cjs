@@ -0,0 +1,164 @@
+/**
+ * `tools/trace_events.py` puts three sources on one Perfetto timeline. Every
+ * one of them is only useful if it lands at the right microsecond, so the
+ * clock mapping, the span widths and the gap markers are checked here on
+ * hand-made input whose answers are known.
+ */
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { spawnSync } = require('node:child_process');
+const fs = require('node:fs');
+const os = require('node:os');
+const path = require('node:path');
+
+const TOOLS = path.resolve(__dirname, '../tools');
+const CONVERTER = path.join(TOOLS, 'trace_events.py');
+const python = spawnSync('python3', ['--version']).status === 0;
+const skip = !python && 'python3 not found';
+
+const EPOCH_MS = 1_786_528_800_000;
+
+function tempDir(t) {
+  const directory = fs.mkdtempSync(path.join(os.tmpdir(), 'taylos-trace-events-'));
+  t.after(() => fs.rmSync(directory, { recursive: true, force: true }));
+  return directory;
+}
+
+function writeJsonl(file, records, tail = '') {
+  fs.writeFileSync(file, records.map((r) => JSON.stringify(r)).join('\n') + '\n' + tail);
+}
+
+function convert(directory, args) {
+  const output = path.join(directory, 'call.json');
+  const run = spawnSync('python3', [CONVERTER, '-o', output, ...args], { encoding: 'utf8' });
+  return { run, trace: run.status === 0 ? JSON.parse(fs.readFileSync(output, 'utf8')) : null };
+}
+
+function chunk(source, start, end, { session = 'cap-a', generation = 0, seq = 0 } = {}) {
+  return {
+    command: 'audio_chunk_meta',
+    schema_version: 1,
+    capture_session_id: session,
+    capture_generation: generation,
+    source,
+    chunk_seq: seq,
+    capture_start_ms: start,
+    capture_end_ms: end,
+    session_epoch_ms: EPOCH_MS,
+    sample_rate: 24_000,
+    channel_count: 1,
+    bytes_per_sample: 2,
+    sample_count: (end - start) * 24,
+    byte_length: (end - start) * 48,
+  };
+}
+
+test('diagnostics land at their ISO `at`, and durations end there', { skip }, (t) => {
+  const directory = tempDir(t);
+  const diagnostics = path.join(directory, 'audio-diagnostics.log');
+  writeJsonl(diagnostics, [
+    { at: '2026-08-12T10:00:00.250Z', event: 'capture_started', status: 'ok' },
+    { at: '2026-08-12T10:00:02.000Z', event: 'system_audio_ready', readyInMs: 1500 },
+    { at: '2026-08-12T10:00:12.000Z', event: 'system_audio_stall', ageMs: 8000 },
+  ]);
+
+  const { run, trace } = convert(directory, ['--diagnostics', diagnostics]);
+  assert.equal(run.status, 0, run.stderr);
+  const byName = Object.fromEntries(trace.traceEvents.filter((e) => e.ts !== undefined).map((e) => [e.name, e]));
+
+  assert.equal(byName['capture_started:ok'].ph, 'i');
+  assert.equal(byName['capture_started:ok'].ts, Date.parse('2026-08-12T10:00:00.250Z') * 1000);
+
+  const ready = byName.system_audio_ready;
+  assert.equal(ready.ph, 'X');
+  assert.equal(ready.dur, 1_500_000);
+  assert.equal(ready.ts + ready.dur, Date.parse('2026-08-12T10:00:02.000Z') * 1000);
+
+  const stall = byName.system_audio_stall;
+  assert.equal(stall.dur, 8_000_000);
+  assert.equal(stall.ts + stall.dur, Date.parse('2026-08-12T10:00:12.000Z') * 1000);
+});
+
+test('a half-written last line is skipped, a bad line mid-file is an error', { skip }, (t) => {
+  const directory = tempDir(t);
+  const live = path.join(directory, 'live.log');
+  writeJsonl(live, [{ at: '2026-08-12T10:00:00.000Z', event: 'capture_started' }], '{"at":"2026-08-12T10:0');
+  const { run, trace } = convert(directory, ['--diagnostics', live]);
+  assert.equal(run.status, 0, run.stderr);
+  assert.deepEqual(trace.traceEvents.filter((e) => e.ts !== undefined).map((e) => e.name), ['capture_started']);
+
+  const corrupt = path.join(directory, 'corrupt.log');
+  fs.writeFileSync(corrupt, '{"at":"2026-08-12T10:0\n{"at":"2026-08-12T10:00:00.000Z","event":"capture_started"}\n');
+  const failed = convert(directory, ['--diagnostics', corrupt]).run;
+  assert.notEqual(failed.status, 0);
+  assert.match(failed.stderr, /record 1 is not JSON/);
+});
+
+test('a gap is only marked within one session, generation and source', { skip }, (t) => {
+  const directory = tempDir(t);
+  const chunks = path.join(directory, 'chunk-meta.jsonl');
+  writeJsonl(chunks, [
+    chunk('mic', 0, 100, { seq: 0 }),
+    chunk('system', 0, 20, { seq: 0 }),
+    chunk('system', 20, 40, { seq: 1 }),
+    // 50 ms missing from the mic: the one real gap.
+    chunk('mic', 150, 250, { seq: 1 }),
+    // A new generation restarts its sequence and clock; not a gap.
+    chunk('mic', 400, 500, { generation: 1, seq: 0 }),
+    // Another session's mic far later; not a gap against cap-a either.
+    chunk('mic', 9_000, 9_100, { session: 'cap-b', seq: 0 }),
+    { command: 'heartbeat' },
+  ]);
+
+  const { run, trace } = convert(directory, ['--chunks', chunks]);
+  assert.equal(run.status, 0, run.stderr);
+  const events = trace.traceEvents.filter((e) => e.ts !== undefined);
+  const gaps = events.filter((e) => e.name.endsWith(' gap'));
+  assert.deepEqual(gaps.map((g) => [g.name, g.ts, g.args]), [
+    ['mic gap', (EPOCH_MS + 100) * 1000, { gap_ms: 50, before_seq: 1 }],
+  ]);
+
+  const spans = events.filter((e) => e.ph === 'X');
+  assert.equal(spans.length, 6);
+  const first = spans.find((e) => e.name === 'mic #1');
+  assert.equal(first.ts, (EPOCH_MS + 150) * 1000);
+  assert.equal(first.dur, 100_000);
+  assert.notEqual(spans.find((e) => e.name === 'system #0').tid, first.tid);
+});
+
+test('a tool trace merges onto the same clock without folding onto the desktop', { skip }, (t) => {
+  const directory = tempDir(t);
+  const gate = path.join(directory, 'gate.json');
+  const before = Date.now() * 1000;
+  const tracer = spawnSync('python3', ['-c', `
+import sys, time
+from pathlib import Path
+sys.path.insert(0, ${JSON.stringify(TOOLS)})
+from trace_events import Tracer
+tracer = Tracer("aec-hardware-gate")
+with tracer.span("playrec", seconds=0.01):
+    time.sleep(0.01)
+tracer.instant("verdict", ok=True)
+tracer.write(Path(${JSON.stringify(gate)}))
+`], { encoding: 'utf8' });
+  assert.equal(tracer.status, 0, tracer.stderr);
+  const after = Date.now() * 1000;
+
+  const diagnostics = path.join(directory, 'audio-diagnostics.log');
+  writeJsonl(diagnostics, [{ at: new Date().toISOString(), event: 'capture_started' }]);
+  const { run, trace } = convert(directory, ['--diagnostics', diagnostics, '--tool', gate]);
+  assert.equal(run.status, 0, run.stderr);
+
+  const events = trace.traceEvents;
+  const playrec = events.find((e) => e.name === 'playrec');
+  assert.ok(playrec.ts >= before && playrec.ts <= after, 'tool span is not on the epoch clock');
+  assert.ok(playrec.dur >= 10_000);
+  assert.deepEqual(playrec.args, { seconds: 0.01 });
+  assert.ok(events.some((e) => e.name === 'verdict' && e.ph === 'i'));
+
+  const processes = events.filter((e) => e.ph === 'M' && e.name === 'process_name');
+  assert.deepEqual(processes.map((e) => e.args.name).sort(), ['Taylos desktop', 'aec-hardware-gate']);
+  const desktop = processes.find((e) => e.args.name === 'Taylos desktop').pid;
+  assert.notEqual(playrec.pid, desktop);
+  assert.equal(events.find((e) => e.name === 'capture_started').pid, desktop);
+});
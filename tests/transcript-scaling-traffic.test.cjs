@@ -0,0 +1,76 @@
+/**
+ * Is the traffic `tools/transcript-scaling.py` generates really on contract?
+ *
+ * The scaling bench only measures the path ListenView takes if every event is
+ * accepted: a rejected event costs nothing, so an off-contract generator would
+ * report a flat, fast reducer that the overlay never sees. The bench counts
+ * rejections, but only after a million-event run; this catches a generator
+ * change in seconds, through the same adapter and reducer the bench drives.
+ */
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { spawnSync } = require('node:child_process');
+const fs = require('node:fs');
+const os = require('node:os');
+const path = require('node:path');
+
+const { adaptServerTranscriptEvent } = require('../dist/main/realtime-transcript-adapter.js');
+const {
+  createRealtimeTranscriptState,
+  applyRealtimeTranscriptEvent,
+} = require('../dist/main/realtime-transcript-state.js');
+const { REORDER_WINDOW_MS } = require('../dist/main/transcript-order.js');
+
+const GENERATOR = path.resolve(__dirname, '../tools/transcript-scaling.py');
+const EVENTS = 5_000;
+const python = spawnSync('python3', ['--version']).status === 0;
+
+function generate(t, seed) {
+  const directory = fs.mkdtempSync(path.join(os.tmpdir(), 'taylos-transcript-scaling-'));
+  t.after(() => fs.rmSync(directory, { recursive: true, force: true }));
+  const file = path.join(directory, 'call.jsonl');
+  const run = spawnSync('python3', [GENERATOR, `--events=${EVENTS}`, `--seed=${seed}`, `--write=${file}`], {
+    encoding: 'utf8',
+  });
+  assert.equal(run.status, 0, run.stderr);
+  const [meta, ...messages] = fs.readFileSync(file, 'utf8').trim().split('\n').map((line) => JSON.parse(line));
+  return { meta, messages };
+}
+
+for (const seed of [1, 2, 3]) {
+  test(`generated traffic (seed ${seed}) is accepted event by event`, { skip: !python && 'python3 not found' }, (t) => {
+    const { meta, messages } = generate(t, seed);
+    assert.equal(messages.length, EVENTS);
+
+    let state = createRealtimeTranscriptState();
+    const rejections = [];
+    for (const message of messages) {
+      const adapted = adaptServerTranscriptEvent(message, meta.chatId);
+      if (!adapted.event) {
+        rejections.push(`adapter:${adapted.reason} ${message.data.event_id}`);
+        continue;
+      }
+      const transition = applyRealtimeTranscriptEvent(state, adapted.event);
+      if (!transition.accepted) {
+        rejections.push(`${transition.reason} ${message.data.event_id} seq ${message.data.seq}`);
+      }
+      state = transition.state;
+    }
+    assert.deepEqual(rejections.slice(0, 5), [], `${rejections.length} of ${EVENTS} events rejected`);
+    assert.ok(state.rows.some((row) => row.source === 'mic') && state.rows.some((row) => row.source === 'system'));
+  });
+}
+
+test('no generated event arrives outside the reorder window', { skip: !python && 'python3 not found' }, (t) => {
+  // Lateness beyond the window takes the frozen-history path in
+  // inSpokenOrder, which is not the path the bench claims to measure.
+  const { messages } = generate(t, 1);
+  let newest = Number.NEGATIVE_INFINITY;
+  let worst = 0;
+  for (const { data } of messages) {
+    newest = Math.max(newest, data.capture_start_ms);
+    worst = Math.max(worst, newest - data.capture_start_ms);
+  }
+  assert.ok(worst < REORDER_WINDOW_MS, `an event arrived ${worst} ms behind the newest row`);
+  assert.ok(worst > 0, 'the stream never reorders, so it no longer exercises ordering');
+});
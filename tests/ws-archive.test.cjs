@@ -0,0 +1,305 @@
+/**
+ * The /ws/transcribe archive: what `tools/ws_archive.py` writes must survive a
+ * killed recorder and come back byte for byte, and replay must finish - with
+ * an error if need be - against a target that will not talk to it.
+ *
+ * The archive is written through `ArchiveWriter` itself, the class the
+ * recording proxy uses, so no backend or desktop is needed; replay and the
+ * proxy itself run against `tools/ws_mock.py`.
+ */
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { spawn, spawnSync } = require('node:child_process');
+const fs = require('node:fs');
+const os = require('node:os');
+const path = require('node:path');
+
+const TOOLS = path.resolve(__dirname, '../tools');
+const ARCHIVE_CLI = path.join(TOOLS, 'ws_archive.py');
+const MOCK_CLI = path.join(TOOLS, 'ws_mock.py');
+const available = spawnSync('python3', ['-c', 'import websockets']).status === 0;
+const skip = !available && 'python3 with websockets not found';
+
+/** Run Python with `tools/` importable; the snippet prints one JSON line. */
+function python(code) {
+  const run = spawnSync('python3', ['-c', `import sys, json\nsys.path.insert(0, ${JSON.stringify(TOOLS)})\n${code}`], {
+    encoding: 'utf8',
+  });
+  assert.equal(run.status, 0, run.stderr);
+  return JSON.parse(run.stdout.trim().split('\n').pop());
+}
+
+function archiveCli(args, options = {}) {
+  return spawnSync('python3', [ARCHIVE_CLI, ...args], { encoding: 'utf8', ...options });
+}
+
+function tempArchive(t) {
+  const directory = fs.mkdtempSync(path.join(os.tmpdir(), 'taylos-ws-archive-'));
+  t.after(() => fs.rmSync(directory, { recursive: true, force: true }));
+  return path.join(directory, 'calls.wsa');
+}
+
+/**
+ * Python that records one desktop-shaped session: the provider's `dg_open`,
+ * then `chunks` meta + PCM pairs of 100 ms on the capture clock.
+ */
+function recordSession(archive, { token = 'jwt-secret', chunks = 25, close = true } = {}) {
+  return `
+from pathlib import Path
+import ws_archive as a
+w = a.ArchiveWriter(Path(${JSON.stringify(archive)}))
+s, t = w.open_session("/ws/transcribe?chat_id=4711&token=${token}&source=mic&sample_rate=24000")
+w.frame(s, t, a.S2C_TEXT, json.dumps({"type": "status", "data": {"dg_open": True}}).encode())
+for i in range(${chunks}):
+    meta = {"command": "audio_chunk_meta", "schema_version": 1, "capture_session_id": "cap-1",
+            "capture_generation": 0, "source": "mic", "chunk_seq": i, "capture_start_ms": i * 100,
+            "capture_end_ms": (i + 1) * 100, "session_epoch_ms": 1756000000000, "sample_rate": 24000,
+            "channel_count": 1, "bytes_per_sample": 2, "sample_count": 2400, "byte_length": 4800}
+    w.frame(s, t, a.C2S_TEXT, json.dumps(meta).encode())
+    w.frame(s, t, a.C2S_BINARY, bytes([i % 256]) * 4800)
+if ${close ? 'True' : 'False'}:
+    w.close_session(s, t, 1000, "")
+w.close()
+print(json.dumps({"session": s}))
+`;
+}
+
+/** Resolves with the first `ws://` URL a tool prints after `after`. */
+function listening(child, after) {
+  return new Promise((resolve, reject) => {
+    let out = '';
+    child.stdout.on('data', (chunk) => {
+      out += chunk;
+      const hit = out.match(new RegExp(`${after} (ws:\\/\\/\\S+)`));
+      if (hit) resolve(hit[1]);
+    });
+    child.on('exit', (code) => reject(new Error(`${after}: exited with ${code}`)));
+  });
+}
+
+async function startMock(t, extra = []) {
+  const mock = spawn('python3', ['-u', MOCK_CLI, '--port=0', ...extra], { stdio: ['ignore', 'pipe', 'pipe'] });
+  t.after(() => mock.kill());
+  return { mock, url: await listening(mock, 'on') };
+}
+
+/**
+ * A desktop stand-in that waits for `dg_open` through the proxy, then either
+ * drops its TCP connection without a close frame or reports how it was closed.
+ */
+function desktop(proxy, { abort }) {
+  return spawn('python3', ['-u', '-c', `
+import asyncio, json, websockets
+async def main():
+    async with websockets.connect(${JSON.stringify(proxy)} + "/ws/transcribe?chat_id=4711&source=mic") as ws:
+        try:
+            async for message in ws:
+                if json.loads(message).get("data", {}).get("dg_open"):
+                    print("ready", flush=True)
+                    if ${abort ? 'True' : 'False'}:
+                        ws.transport.abort()
+                        return
+        except websockets.ConnectionClosed:
+            pass
+    print(json.dumps({"code": ws.close_code, "reason": ws.close_reason}))
+asyncio.run(main())
+`], { stdio: ['ignore', 'pipe', 'pipe'] });
+}
+
+function output(child) {
+  let out = '';
+  child.stdout.on('data', (chunk) => { out += chunk; });
+  return {
+    ready: new Promise((resolve) => child.stdout.on('data', () => out.includes('ready') && resolve())),
+    exited: new Promise((resolve) => child.on('exit', () => resolve(out))),
+  };
+}
+
+test('records read back byte for byte, and the index finds every session', { skip }, (t) => {
+  const archive = tempArchive(t);
+  python(recordSession(archive));
+  python(recordSession(archive, { chunks: 3 }));
+
+  const read = python(`
+from pathlib import Path
+import ws_archive as a
+archive = Path(${JSON.stringify(archive)})
+index = a.read_index(archive.with_name(archive.name + ".idx"))
+second = a.session_records(archive, index[1])
+print(json.dumps({"index": index, "kinds": [r.kind for r in second],
+                  "pcm": [r.payload.hex()[:4] for r in second if r.kind == a.C2S_BINARY],
+                  "lengths": sorted({len(r.payload) for r in second if r.kind == a.C2S_BINARY})}))
+`);
+  assert.deepEqual(read.index.map((s) => [s.session, s.frames, s.closed]), [[1, 51, true], [2, 7, true]]);
+  assert.deepEqual(read.kinds, [0, 4, 2, 3, 2, 3, 2, 3, 1]);
+  assert.deepEqual(read.pcm, ['0000', '0101', '0202']);
+  assert.deepEqual(read.lengths, [4800]);
+  // Flat test PCM deflates to almost nothing; raw it alone would be 28 x 4800.
+  assert.ok(fs.statSync(archive).size < 28 * 4800 / 4, `archive is ${fs.statSync(archive).size} bytes`);
+  for (const session of read.index) {
+    assert.match(session.path, /token=REDACTED/);
+    assert.doesNotMatch(session.path, /jwt-secret/);
+  }
+});
+
+test('a torn tail is cut off on reopen, so the next session stays readable', { skip }, (t) => {
+  const archive = tempArchive(t);
+  python(recordSession(archive));
+  python(recordSession(archive, { close: false }));
+  // The recorder was killed in the middle of session 2's last PCM frame,
+  // which deflated is a few dozen bytes.
+  fs.truncateSync(archive, fs.statSync(archive).size - 5);
+
+  python(recordSession(archive, { chunks: 2 }));
+
+  const listed = archiveCli(['ls', archive, '--reindex']);
+  assert.equal(listed.status, 0, listed.stderr);
+  const rows = listed.stdout.trim().split('\n').slice(1).map((line) => line.trim().split(/\s+/));
+  // session, frames: 2 lost its torn last frame and never closed; 3 is whole.
+  assert.deepEqual(rows.map((row) => [row[0], row[row.length - 4]]), [['1', '51'], ['2', '50'], ['3', '5']]);
+  assert.match(rows[1].join(' '), /open/);
+
+  const third = python(`
+from pathlib import Path
+import ws_archive as a
+archive = Path(${JSON.stringify(archive)})
+info = next(s for s in a.read_index(archive.with_name(archive.name + ".idx")) if s["session"] == 3)
+print(json.dumps([r.kind for r in a.session_records(archive, info)]))
+`);
+  assert.deepEqual(third, [0, 4, 2, 3, 2, 3, 1]);
+});
+
+test('a TWSA1 archive still reads, and appending to it does not deflate', { skip }, (t) => {
+  const archive = tempArchive(t);
+  const out = python(`
+import struct
+from pathlib import Path
+import ws_archive as a
+archive = Path(${JSON.stringify(archive)})
+opened = json.dumps({"path": "/ws/transcribe?source=mic", "started_at": 1756000000.0}).encode()
+pcm = bytes(4800)
+archive.write_bytes(a.MAGIC_V1 + a.HEADER.pack(a.OPEN, 1, 0, len(opened)) + opened
+                    + a.HEADER.pack(a.C2S_BINARY, 1, 100000, len(pcm)) + pcm)
+w = a.ArchiveWriter(archive)
+s, t = w.open_session("/ws/transcribe?source=system")
+w.frame(s, t, a.C2S_BINARY, pcm)
+w.close_session(s, t, 1000, "")
+w.close()
+print(json.dumps({"magic": archive.read_bytes()[:6].decode(), "size": archive.stat().st_size,
+                  "stored": [r.kind for _, r in a._stored_records(archive)],
+                  "read": [[r.session, r.kind, len(r.payload)] for _, r in a.read_records(archive)]}))
+`);
+  assert.equal(out.magic, 'TWSA1\n');
+  assert.ok(out.stored.every((kind) => kind < 0x80), out.stored.join());
+  assert.deepEqual(out.read.filter(([, kind]) => kind === 3), [[1, 3, 4800], [2, 3, 4800]]);
+});
+
+test('chunks extracts the envelopes trace_events draws', { skip }, (t) => {
+  const archive = tempArchive(t);
+  python(recordSession(archive, { chunks: 4 }));
+  python(recordSession(archive, { chunks: 2 }));
+  const output = path.join(path.dirname(archive), 'chunk-meta.jsonl');
+
+  const extracted = archiveCli(['chunks', archive, '--session=2', '-o', output]);
+  assert.equal(extracted.status, 0, extracted.stderr);
+  const lines = fs.readFileSync(output, 'utf8').trim().split('\n').map((line) => JSON.parse(line));
+  assert.deepEqual(lines.map((m) => [m.command, m.chunk_seq]), [['audio_chunk_meta', 0], ['audio_chunk_meta', 1]]);
+
+  const everything = archiveCli(['chunks', archive]);
+  assert.equal(everything.stdout.trim().split('\n').length, 6);
+
+  const trace = path.join(path.dirname(archive), 'call.json');
+  const converted = spawnSync('python3', [path.join(TOOLS, 'trace_events.py'), '-o', trace, '--chunks', output], {
+    encoding: 'utf8',
+  });
+  assert.equal(converted.status, 0, converted.stderr);
+  const spans = JSON.parse(fs.readFileSync(trace, 'utf8')).traceEvents.filter((e) => e.ph === 'X');
+  assert.deepEqual(spans.map((e) => e.name), ['mic #0', 'mic #1']);
+});
+
+test('a socket that drops without a close frame is passed on with a code that can be sent', { skip }, async (t) => {
+  const archive = tempArchive(t);
+  const { mock, url: upstream } = await startMock(t);
+  const recorder = spawn('python3', ['-u', ARCHIVE_CLI, 'record', archive, `--upstream=${upstream}`, '--port=0'], {
+    stdio: ['ignore', 'pipe', 'pipe'],
+  });
+  t.after(() => recorder.kill());
+  let errors = '';
+  recorder.stderr.on('data', (chunk) => { errors += chunk; });
+  const proxy = await listening(recorder, 'recording');
+
+  // The desktop vanishes: the proxy sees 1006, which close() refuses to send.
+  const dropped = output(desktop(proxy, { abort: true }));
+  await dropped.exited;
+
+  // The backend vanishes: the desktop must get a real close, not a hang.
+  const waiting = desktop(proxy, { abort: false });
+  const held = output(waiting);
+  await held.ready;
+  mock.kill('SIGKILL');
+  const timer = setTimeout(() => waiting.kill(), 10_000);
+  const closed = JSON.parse((await held.exited).trim().split('\n').pop());
+  clearTimeout(timer);
+  assert.deepEqual(closed, { code: 1011, reason: 'peer closed with 1006' });
+
+  recorder.kill();
+  await new Promise((resolve) => recorder.on('exit', resolve));
+  assert.doesNotMatch(errors, /connection handler failed|Traceback/);
+  const codes = python(`
+from pathlib import Path
+import ws_archive as a
+print(json.dumps([s["code"] for s in a.reindex(Path(${JSON.stringify(archive)}))]))
+`);
+  // The archive keeps what was observed, not what was passed on.
+  assert.deepEqual(codes, [1006, 1006]);
+});
+
+test('redact hides the token and with_token puts one back', { skip }, () => {
+  const out = python(`
+import ws_archive as a
+path = "/ws/transcribe?chat_id=4711&token=eyJ.secret&source=mic"
+redacted = a.redact(path)
+print(json.dumps({"redacted": redacted, "restored": a.with_token(redacted, "fresh"),
+                  "kept": a.with_token(redacted, None), "none": a.redact("/ws/transcribe?source=mic")}))
+`);
+  assert.equal(out.redacted, '/ws/transcribe?chat_id=4711&token=REDACTED&source=mic');
+  assert.equal(out.restored, '/ws/transcribe?chat_id=4711&token=fresh&source=mic');
+  assert.equal(out.kept, out.redacted);
+  assert.equal(out.none, '/ws/transcribe?source=mic');
+});
+
+test('replay with the right token gets the target\'s segments', { skip }, async (t) => {
+  const archive = tempArchive(t);
+  python(recordSession(archive));
+  const { url: target } = await startMock(t, ['--token=fresh']);
+
+  const replay = spawn('python3', [ARCHIVE_CLI, 'replay', archive, `--target=${target}`, '--speed=0', '--token=fresh']);
+  let out = '';
+  replay.stdout.on('data', (chunk) => { out += chunk; });
+  const code = await new Promise((resolve) => replay.on('exit', resolve));
+  assert.equal(code, 0, out);
+  // 2.5 s of audio against the mock's 2 s segments: one comes back, against
+  // none in the recording, which only holds what the desktop sent.
+  assert.match(out, /\s1\/0\s/);
+});
+
+test('replay the target rejects before dg_open reports an error instead of hanging', { skip }, async (t) => {
+  const archive = tempArchive(t);
+  python(recordSession(archive));
+  const { url: target } = await startMock(t, ['--token=fresh']);
+
+  // No --token: the archive's REDACTED placeholder goes to a target that
+  // checks it, which closes with 1008 before it is ever ready.
+  const started = Date.now();
+  const replay = spawn('python3', [ARCHIVE_CLI, 'replay', archive, `--target=${target}`, '--speed=0'], {
+    env: { ...process.env, TAYLOS_TOKEN: '' },
+  });
+  let out = '';
+  replay.stdout.on('data', (chunk) => { out += chunk; });
+  const timer = setTimeout(() => replay.kill(), 20_000);
+  const code = await new Promise((resolve) => replay.on('exit', resolve));
+  clearTimeout(timer);
+  assert.equal(code, 1, out);
+  assert.match(out, /ERROR closed before dg_open: 1008/);
+  assert.ok(Date.now() - started < 10_000, `replay took ${Date.now() - started} ms to give up`);
+});
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """Does the shipped canceller remove real echo, on this machine, right now?
 
-    python3 tools/aec-hardware-gate.py
+    python3 tools/aec-hardware-gate.py            # default devices, full gate
+    python3 tools/aec-hardware-gate.py --matrix   # every usable device pair
+    python3 tools/aec-hardware-gate.py --matrix --fresh   # ignore the cache
+    python3 tools/aec-hardware-gate.py --trace /tmp/gate.json   # stage timings
 
 Plays speech through the SPEAKERS, records the MICROPHONE, and reports the four
 numbers that decide whether AEC can work here - then hands the recording to the
@@ -21,11 +24,25 @@ either:
    versus 0.708 and 17.5 dB through one full-duplex stream. The rig was broken,
    not the canceller. `sounddevice.playrec` keeps both on one clock.
 
+`--matrix` is for QA machines with docks, USB headsets and monitor speakers.
+It probes every input/output pair `sounddevice` can see, skipping the same
+in-ear/bluetooth names the gate aborts on, and ranks them. The probe is short
+and acoustic only - ERL, bulk delay, peak sharpness, coherence - because those
+decide whether AEC *can* work on a pair; run the full gate on the winner to
+measure the canceller. Results are cached by device fingerprint, so a re-run
+only plays audio through pairs that are new or whose devices changed.
+
+`--trace` writes every stage as a Chrome trace-event span; merge it with the
+app's diagnostics and chunk metadata via `tools/trace_events.py` to see the
+gate on the same timeline as the capture it measured.
+
 Requires: sounddevice, scipy, numpy, sox, and a built `dist/main`.
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
 import shutil
 import subprocess
@@ -33,13 +50,25 @@ import sys
 from pathlib import Path
 
 import numpy as np
-import sounddevice as sd
 from scipy import signal
 
+try:
+    import sounddevice as sd
+except (ImportError, OSError):
+    # No sounddevice, or no PortAudio, as on a headless CI box. The
+    # measurement math stays importable for `tools/python-bench.py`; anything
+    # that touches a device stops in main() with a readable message instead
+    # of a traceback here.
+    sd = None
+
+from trace_events import Tracer
+
 RATE = 48_000
 AEC_RATE = 24_000
 SECONDS = 15
 SPEECH = Path(__file__).resolve().parent / "aec-speech" / "far.wav"
+MATRIX_SECONDS = 4
+MATRIX_CACHE = Path(__file__).resolve().parent / "aec-out" / "hardware-matrix.json"
 
 # What a working path looks like. Below these the run is reported as a failure
 # rather than a number, because a number without a verdict is what let this sit
@@ -48,12 +77,19 @@ MIN_PEAK_SHARPNESS = 10.0
 MIN_COHERENCE = 0.30
 MIN_ERLE_DB = 10.0
 
+TRACE = Tracer("aec-hardware-gate")
+
+
+def is_in_ear(name: str) -> bool:
+    lowered = name.lower()
+    return "airpod" in lowered or "bluetooth" in lowered
+
 
 def require_builtin_devices() -> None:
     inp = sd.query_devices(kind="input")["name"]
     out = sd.query_devices(kind="output")["name"]
     print(f"  input : {inp}\n  output: {out}")
-    bad = [n for n in (inp, out) if "airpod" in n.lower() or "bluetooth" in n.lower()]
+    bad = [n for n in (inp, out) if is_in_ear(n)]
     if bad:
         sys.exit(
             f"\nABORT: {bad[0]} is selected.\n"
@@ -63,28 +99,182 @@ def require_builtin_devices() -> None:
         )
 
 
-def probe() -> np.ndarray:
+def probe(seconds: int = SECONDS) -> np.ndarray:
     if not SPEECH.exists():
         sys.exit(f"missing speech probe: {SPEECH}")
-    raw = subprocess.run(
-        [shutil.which("sox") or "sox", str(SPEECH), "-t", "raw", "-r", str(RATE),
-         "-e", "signed", "-b", "16", "-c", "1", "-"],
-        check=True, capture_output=True,
-    ).stdout
+    with TRACE.span("probe decode", seconds=seconds):
+        raw = subprocess.run(
+            [shutil.which("sox") or "sox", str(SPEECH), "-t", "raw", "-r", str(RATE),
+             "-e", "signed", "-b", "16", "-c", "1", "-"],
+            check=True, capture_output=True,
+        ).stdout
     x = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
-    return x[: RATE * SECONDS]
+    return x[: RATE * seconds]
 
 
 def write_wav(path: Path, data: np.ndarray, rate: int) -> None:
     pcm = (np.clip(data, -1, 1) * 32767).astype("<i2")
-    subprocess.run(
-        [shutil.which("sox") or "sox", "-t", "raw", "-r", str(rate), "-e", "signed",
-         "-b", "16", "-c", "1", "-", str(path)],
-        input=pcm.tobytes(), check=True, capture_output=True,
-    )
+    with TRACE.span("wav write", path=str(path)):
+        subprocess.run(
+            [shutil.which("sox") or "sox", "-t", "raw", "-r", str(rate), "-e", "signed",
+             "-b", "16", "-c", "1", "-", str(path)],
+            input=pcm.tobytes(), check=True, capture_output=True,
+        )
 
 
-def main() -> int:
+def measure(x: np.ndarray, y: np.ndarray) -> tuple[float, int, float, float]:
+    """ERL in dB, bulk delay in samples, peak/median sharpness, voice-band coherence."""
+    rms = lambda a: float(np.sqrt(np.mean(a ** 2)))
+    erl = 20 * np.log10(rms(x) / max(rms(y), 1e-12))
+
+    n = 1 << int(np.ceil(np.log2(len(x) * 2)))
+    with TRACE.span("fft correlation", fft_size=n):
+        cc = np.fft.irfft(np.conj(np.fft.rfft(x, n)) * np.fft.rfft(y, n), n)[: RATE // 2]
+        lag = int(np.argmax(np.abs(cc)))
+        sharpness = float(np.abs(cc[lag]) / max(np.median(np.abs(cc)), 1e-12))
+
+    m = min(len(x), len(y) - lag)
+    with TRACE.span("coherence", samples=m):
+        _, cxy = signal.coherence(x[:m], y[lag:lag + m], fs=RATE, nperseg=4096)
+        freqs = np.linspace(0, RATE / 2, len(cxy))
+        coherence = float(np.mean(cxy[(freqs >= 300) & (freqs <= 3400)]))
+    return float(erl), lag, sharpness, coherence
+
+
+def device_fingerprint(device: dict) -> str:
+    """What identifies a device across runs, index excluded.
+
+    PortAudio indices shift whenever a dock or headset is plugged in, so they
+    cannot key the cache. The host API, name, channel counts and default rate
+    together change when the device does - a firmware update that moves the
+    default rate is a different device for the purposes of this gate.
+
+    Two identical headsets or docks agree on all of that, so `twin` - the
+    device's rank among same-fingerprint devices, in PortAudio order - tells
+    them apart. It is only appended for the second and later one, so a
+    machine without twins keeps the keys it already has cached.
+    """
+    hostapi = sd.query_hostapis(device["hostapi"])["name"]
+    fingerprint = "|".join((
+        hostapi,
+        device["name"],
+        str(device["max_input_channels"]),
+        str(device["max_output_channels"]),
+        f"{device['default_samplerate']:.0f}",
+    ))
+    twin = device.get("twin", 0)
+    return f"{fingerprint}#{twin + 1}" if twin else fingerprint
+
+
+def label(device: dict) -> str:
+    """The device name, numbered when an identical device is also attached."""
+    twin = device.get("twin", 0)
+    return f"{device['name']} #{twin + 1}" if twin else device["name"]
+
+
+def usable_pairs() -> list[tuple[dict, dict]]:
+    """Every (input, output) pair worth probing, with their PortAudio indices."""
+    devices = [dict(d, index=i) for i, d in enumerate(sd.query_devices())]
+    seen: dict[str, int] = {}
+    for device in devices:
+        fingerprint = device_fingerprint(device)
+        device["twin"] = seen.get(fingerprint, 0)
+        seen[fingerprint] = device["twin"] + 1
+    for fingerprint, count in seen.items():
+        if count > 1:
+            # Which of two identical devices PortAudio lists first can change
+            # on replug, so their cached rows may swap. --fresh re-measures.
+            print(f"  warn  {count} identical devices: {fingerprint.split('|')[1]} "
+                  f"- told apart by PortAudio order only")
+    inputs = [d for d in devices if d["max_input_channels"] > 0]
+    outputs = [d for d in devices if d["max_output_channels"] > 0]
+    pairs = []
+    for inp in inputs:
+        for out in outputs:
+            if is_in_ear(inp["name"]) or is_in_ear(out["name"]):
+                print(f"  skip  {label(inp)} <- {label(out)}  (in-ear/bluetooth)")
+                continue
+            pairs.append((inp, out))
+    return pairs
+
+
+def pair_key(inp: dict, out: dict) -> str:
+    # The probe settings are part of the key: a cached 4 s reading is not
+    # comparable with one taken at a different length or rate.
+    raw = "\n".join((device_fingerprint(inp), device_fingerprint(out),
+                     f"{RATE}/{MATRIX_SECONDS}"))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def usable(row: dict) -> bool:
+    """The matrix verdict: both acoustic gates the full gate applies."""
+    return row["sharpness"] >= MIN_PEAK_SHARPNESS and row["coherence"] >= MIN_COHERENCE
+
+
+def run_matrix(fresh: bool) -> int:
+    print("=" * 68)
+    print("  AEC HARDWARE MATRIX - plays audio OUT LOUD for %ds per pair" % MATRIX_SECONDS)
+    print("=" * 68)
+
+    cache: dict = {}
+    if MATRIX_CACHE.exists() and not fresh:
+        cache = json.loads(MATRIX_CACHE.read_text())
+
+    x = probe(MATRIX_SECONDS)
+    rows = []
+    for inp, out in usable_pairs():
+        key = pair_key(inp, out)
+        hit = cache.get(key)
+        if hit is None:
+            print(f"  probe {label(inp)} <- {label(out)}")
+            try:
+                with TRACE.span("playrec", input=label(inp), output=label(out)):
+                    y = sd.playrec(x.reshape(-1, 1), samplerate=RATE, channels=1, blocking=True,
+                                   device=(inp["index"], out["index"]))[:, 0]
+            except sd.PortAudioError as err:
+                # A pair the host API will not open duplex is a result, not a crash:
+                # it is exactly what QA needs to see in the table.
+                hit = {"error": str(err)}
+            else:
+                erl, lag, sharpness, coherence = measure(x, np.asarray(y, dtype=np.float32))
+                hit = {"erl_db": erl, "delay_ms": lag / RATE * 1000,
+                       "sharpness": sharpness, "coherence": coherence}
+            hit.update(input=label(inp), output=label(out))
+            # Open failures are retried next run: a device busy in another app
+            # now says nothing about whether the pair works.
+            if "error" not in hit:
+                cache[key] = hit
+        else:
+            print(f"  cache {label(inp)} <- {label(out)}")
+        rows.append(hit)
+
+    MATRIX_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    MATRIX_CACHE.write_text(json.dumps(cache, indent=2, sort_keys=True) + "\n")
+
+    # Coherence first: it is the gate that decides whether a linear canceller
+    # has anything to work with. Sharpness breaks ties between pairs that both
+    # cohere. Pairs that failed to open sink to the bottom.
+    measured = sorted((r for r in rows if "error" not in r),
+                      key=lambda r: (r["coherence"], r["sharpness"]), reverse=True)
+    failed = [r for r in rows if "error" in r]
+
+    print("\n" + "-" * 100)
+    print(f"  {'#':>2}  {'input':<28} {'output':<28} {'ERL dB':>7} {'delay':>7} "
+          f"{'peak':>6} {'coh':>6}  verdict")
+    print("-" * 100)
+    for rank, r in enumerate(measured, 1):
+        ok = usable(r)
+        print(f"  {rank:>2}  {r['input'][:28]:<28} {r['output'][:28]:<28} "
+              f"{r['erl_db']:7.1f} {r['delay_ms']:5.1f}ms {r['sharpness']:5.1f}x "
+              f"{r['coherence']:6.3f}  {'usable' if ok else 'NOT CANCELLABLE'}")
+    for r in failed:
+        print(f"   -  {r['input'][:28]:<28} {r['output'][:28]:<28} {r['error']}")
+    print("-" * 100)
+    print(f"  {len(measured)} measured, {len(failed)} failed to open, cache: {MATRIX_CACHE}")
+    return 0 if any(usable(r) for r in measured) else 1
+
+
+def run_gate() -> int:
     print("=" * 68)
     print("  AEC HARDWARE GATE - plays audio OUT LOUD for %ds" % SECONDS)
     print("=" * 68)
@@ -92,21 +282,11 @@ def main() -> int:
 
     x = probe()
     print(f"\n  playing + recording {len(x)/RATE:.0f}s in FULL DUPLEX (one clock)...")
-    y = sd.playrec(x.reshape(-1, 1), samplerate=RATE, channels=1, blocking=True)[:, 0]
+    with TRACE.span("playrec", seconds=len(x) / RATE):
+        y = sd.playrec(x.reshape(-1, 1), samplerate=RATE, channels=1, blocking=True)[:, 0]
     y = np.asarray(y, dtype=np.float32)
 
-    rms = lambda a: float(np.sqrt(np.mean(a ** 2)))
-    erl = 20 * np.log10(rms(x) / max(rms(y), 1e-12))
-
-    n = 1 << int(np.ceil(np.log2(len(x) * 2)))
-    cc = np.fft.irfft(np.conj(np.fft.rfft(x, n)) * np.fft.rfft(y, n), n)[: RATE // 2]
-    lag = int(np.argmax(np.abs(cc)))
-    sharpness = float(np.abs(cc[lag]) / max(np.median(np.abs(cc)), 1e-12))
-
-    m = min(len(x), len(y) - lag)
-    _, cxy = signal.coherence(x[:m], y[lag:lag + m], fs=RATE, nperseg=4096)
-    freqs = np.linspace(0, RATE / 2, len(cxy))
-    coherence = float(np.mean(cxy[(freqs >= 300) & (freqs <= 3400)]))
+    erl, lag, sharpness, coherence = measure(x, y)
 
     print("\n" + "-" * 68)
     print(f"  ECHO RETURN LOSS   {erl:6.1f} dB   speaker -> mic attenuation")
@@ -118,10 +298,11 @@ def main() -> int:
     write_wav(tmp / "aecgate_far.wav", signal.resample_poly(x, 1, 2), AEC_RATE)
     write_wav(tmp / "aecgate_mic.wav", signal.resample_poly(y, 1, 2), AEC_RATE)
 
-    node = subprocess.run(
-        ["node", str(Path(__file__).resolve().parent / "aec-hardware-gate.cjs")],
-        capture_output=True, text=True, cwd=str(Path(__file__).resolve().parents[1]),
-    )
+    with TRACE.span("canceller (node)"):
+        node = subprocess.run(
+            ["node", str(Path(__file__).resolve().parent / "aec-hardware-gate.cjs")],
+            capture_output=True, text=True, cwd=str(Path(__file__).resolve().parents[1]),
+        )
     if node.returncode != 0:
         print(node.stdout + node.stderr)
         sys.exit("canceller step failed")
@@ -146,5 +327,26 @@ def main() -> int:
     return 0
 
 
+def main() -> int:
+    parser = argparse.ArgumentParser(description="AEC hardware gate")
+    parser.add_argument("--matrix", action="store_true",
+                        help="probe every usable input/output pair and rank them")
+    parser.add_argument("--fresh", action="store_true",
+                        help="with --matrix, re-measure pairs that are already cached")
+    parser.add_argument("--trace", type=Path,
+                        help="write stage timings as Chrome trace-event JSON to this path")
+    args = parser.parse_args()
+    if sd is None:
+        sys.exit("sounddevice or PortAudio is missing - this gate needs a real audio device")
+    try:
+        if args.matrix:
+            return run_matrix(args.fresh)
+        return run_gate()
+    finally:
+        if args.trace:
+            TRACE.write(args.trace)
+            print(f"\n  trace: {args.trace}")
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,184 @@
+/**
+ * Push a generated chunk stream through the SHIPPED capture timeline, once per
+ * option setting.
+ *
+ *     node tools/capture-jitter.cjs chunks.bin --settings='[{"maxCaptureClockJitterMs":250}]'
+ *
+ * Driven by `capture-jitter.py`, which generates the stream and tabulates what
+ * this prints. Every chunk goes through `CaptureSessionTimeline` from
+ * `dist/main/capture-timeline.js` exactly as the renderer calls it -
+ * `createFromMonotonicInterval` for the mic, `createSystemFromEpochPts` for
+ * macOS system audio - with a fresh timeline at every session marker, and a
+ * thrown RangeError counted as a dropped chunk, which is what the renderer
+ * does with it.
+ *
+ * The stream is float64 records (see `capture-jitter.py`); each one carries the
+ * chunk's true capture time, so the error of the `capture_start_ms` the
+ * timeline assigned can be measured, not just whether it was accepted.
+ *
+ * Throughput is the whole replay loop: the timeline call, and a typed-array
+ * store of the error. The chunk objects are reused, so allocation in the
+ * numbers is the timeline's own.
+ *
+ * Prints one JSON line per setting.
+ */
+const fs = require('node:fs');
+const path = require('node:path');
+const { performance } = require('node:perf_hooks');
+
+const { CaptureSessionTimeline } = require(path.join(__dirname, '..', 'dist/main/capture-timeline.js'));
+
+const args = process.argv.slice(2);
+const argOf = (name, dflt) => {
+  const hit = args.find((a) => a.startsWith(`--${name}=`));
+  return hit ? hit.slice(name.length + 3) : dflt;
+};
+const STREAM = args.find((a) => !a.startsWith('--'));
+const SETTINGS = JSON.parse(argOf('settings', '[{}]'));
+const MAGIC = 'CJIT1\n';
+const MIC = 0;
+const SYSTEM = 1;
+const SESSION = 2;
+const SAMPLE_RATE = 24_000;
+
+if (!STREAM) {
+  console.error("usage: node tools/capture-jitter.cjs <chunks.bin> [--settings='[{...}]']");
+  process.exit(2);
+}
+
+function load(file) {
+  const buf = fs.readFileSync(file);
+  if (buf.toString('latin1', 0, MAGIC.length) !== MAGIC) throw new Error(`${file} is not a capture-jitter stream`);
+  const headerLength = buf.readUInt32LE(MAGIC.length);
+  const start = MAGIC.length + 4;
+  const header = JSON.parse(buf.toString('utf8', start, start + headerLength));
+  const body = buf.subarray(start + headerLength);
+  // Copy into an aligned buffer: Float64Array cannot view an odd offset.
+  const records = new Float64Array(body.length / 8);
+  new Uint8Array(records.buffer).set(body);
+  return { header, records };
+}
+
+function reasonOf(message) {
+  if (message.includes('moved backwards')) return 'backwards';
+  if (message.includes('foreign clock domains')) return 'skew';
+  if (message.includes('implausible age')) return 'pts-age';
+  if (message.includes('predates')) return 'predates';
+  return 'other';
+}
+
+function percentile(sorted, q) {
+  return sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))] : 0;
+}
+
+function summarise(errors, count, ends) {
+  const sorted = errors.subarray(0, count).sort();
+  return {
+    p50: Number(percentile(sorted, 0.5).toFixed(3)),
+    p99: Number(percentile(sorted, 0.99).toFixed(3)),
+    max: Number((count ? sorted[count - 1] : 0).toFixed(3)),
+    meanEnd: Number((ends.length ? ends.reduce((a, b) => a + b, 0) / ends.length : 0).toFixed(3)),
+  };
+}
+
+function replay(records, fields, options) {
+  const n = records.length / fields;
+  const errors = { mic: new Float64Array(n), system: new Float64Array(n) };
+  const accepted = { mic: 0, system: 0 };
+  const seen = { mic: 0, system: 0 };
+  const rejected = { mic: 0, system: 0 };
+  const reasons = {};
+  const clamped = { mic: 0, system: 0 };
+  let worstClampMs = 0;
+  const ends = { mic: [], system: [] };
+  const last = { mic: null, system: null };
+  let timeline = null;
+  let sessions = 0;
+  const mic = { source: 'mic', startPerformanceMs: 0, endPerformanceMs: 0, sampleRate: SAMPLE_RATE, byteLength: 0 };
+  const sys = {
+    capturedAtUnixMs: 0, observedAtUnixMs: 0, observedAtPerformanceMs: 0, sampleRate: SAMPLE_RATE, byteLength: 0,
+  };
+
+  const closeSession = () => {
+    if (!timeline) return;
+    for (const source of ['mic', 'system']) {
+      clamped[source] += timeline.clampedJitter[source].count;
+      worstClampMs = Math.max(worstClampMs, timeline.clampedJitter[source].worstMs);
+      if (last[source] !== null) ends[source].push(last[source]);
+      last[source] = null;
+    }
+  };
+
+  const t0 = performance.now();
+  for (let o = 0; o < records.length; o += fields) {
+    const kind = records[o];
+    if (kind === SESSION) {
+      closeSession();
+      timeline = new CaptureSessionTimeline({
+        generation: 0,
+        epochUnixMs: records[o + 1],
+        originPerformanceMs: records[o + 2],
+        ...options,
+      });
+      sessions += 1;
+      continue;
+    }
+    const source = kind === MIC ? 'mic' : 'system';
+    seen[source] += 1;
+    try {
+      let metadata;
+      if (kind === MIC) {
+        mic.startPerformanceMs = records[o + 1];
+        mic.endPerformanceMs = records[o + 2];
+        mic.byteLength = records[o + 4];
+        metadata = timeline.createFromMonotonicInterval(mic);
+      } else {
+        sys.capturedAtUnixMs = records[o + 1];
+        sys.observedAtUnixMs = records[o + 2];
+        sys.observedAtPerformanceMs = records[o + 3];
+        sys.byteLength = records[o + 4];
+        metadata = timeline.createSystemFromEpochPts(sys);
+      }
+      const error = Math.abs(metadata.capture_start_ms - records[o + 5]);
+      errors[source][accepted[source]] = error;
+      accepted[source] += 1;
+      last[source] = error;
+    } catch (err) {
+      if (!(err instanceof RangeError)) throw err;
+      rejected[source] += 1;
+      const reason = reasonOf(err.message);
+      reasons[reason] = (reasons[reason] || 0) + 1;
+    }
+  }
+  const seconds = (performance.now() - t0) / 1000;
+  closeSession();
+
+  const chunks = seen.mic + seen.system;
+  return {
+    setting: options,
+    chunks,
+    sessions,
+    seconds: Number(seconds.toFixed(3)),
+    chunksPerSec: Math.round(chunks / seconds),
+    rejected,
+    rejectRate: {
+      mic: seen.mic ? rejected.mic / seen.mic : 0,
+      system: seen.system ? rejected.system / seen.system : 0,
+    },
+    reasons,
+    clamped,
+    worstClampMs: Number(worstClampMs.toFixed(3)),
+    error: {
+      mic: summarise(errors.mic, accepted.mic, ends.mic),
+      system: summarise(errors.system, accepted.system, ends.system),
+    },
+  };
+}
+
+const { header, records } = load(STREAM);
+// Let the JIT settle on the shipped defaults first, so the first setting in
+// the sweep is not the one that pays for compilation.
+replay(records.subarray(0, Math.min(records.length, 200_000 * header.fields)), header.fields, {});
+for (const options of SETTINGS) {
+  console.log(JSON.stringify(replay(records, header.fields, options)));
+}
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""What do the capture-timeline tolerances cost, on millions of chunks?
+
+    python3 tools/capture-jitter.py                          # 2M chunks, one-axis sweep
+    python3 tools/capture-jitter.py --grid                   # every combination
+    python3 tools/capture-jitter.py --chunks 500000 --drift-ppm 40
+    python3 tools/capture-jitter.py --write chunks.bin       # stream only, no bench
+
+`CaptureSessionTimeline` decides the fate of every chunk with three numbers:
+`maxCaptureClockJitterMs` (a backwards move up to this is clamped, beyond it
+the chunk is dropped), `maxClockDomainSkewMs` (Date.now() and performance.now()
+disagreeing by more than this drops a system chunk) and `maxPtsAgeMs` (a system
+PTS older than this on arrival is dropped). The jitter threshold was already
+moved once, from 10 ms to 250 ms, on ONE measured session - and a clamp is not
+free either: it starts the chunk at the previous end, so a stamp that came in
+late pushes every following chunk late until a gap absorbs it. This measures
+both sides, drops and error, for each setting.
+
+The streams are generated, but shaped like the real ones and stamped the way
+`audio-processor-glass-parity.ts` stamps them:
+
+  * mic: `MonotonicAudioChunk`s of 2400 samples (100 ms), timed by counting
+    samples from one origin - so they never move backwards, but a mic clock
+    that runs fast, or a glitch that loses samples, makes them drift from the
+    truth without anything noticing;
+  * system: `SystemEpochPtsAudioChunk`s of 480 samples (20 ms), as the macOS
+    helper delivers, stamped with ScreenCaptureKit's PTS converted to Unix
+    time, arriving `HELPER_AGE_MS` later (both from `aec-clock-domain-bench.cjs`).
+    On top of small stamp noise, some stamps jump by a lognormal amount, late
+    or early; the system audio clock drifts against the host clock; the helper
+    occasionally stalls and delivers a backlog; and the wall clock slews and
+    occasionally steps against the monotonic one.
+
+Calibration comes from `audio-diagnostics` logs (`--diagnostics`, the
+committed 2026-08-12 session by default): session length, system start-up,
+helper stalls, the AEC reference-gap fraction, and any logged "moved backwards
+by N ms" rejections. That log predates the rejection message, so the jump
+distribution falls back to the 2026-08-22 measurement recorded in
+`capture-timeline.ts` - 24 backwards moves in a session, 5 / 10 / 15 / 18 / 27
+/ 46.8 ms, median 10 - fitted as a lognormal and spread over the session
+length. Clock drift and wall-clock steps are in no log we have; their
+constants below are typical crystal and NTP figures, and are flags or
+constants precisely so that the sweep can show whether they matter.
+
+Every chunk carries its true capture time, so `tools/capture-jitter.cjs` can
+report, per option setting, how far the timeline's `capture_start_ms` ended up
+from it. The stream is split into sessions of the fitted length, each with a
+fresh timeline, because that is the unit a tolerance is judged over in
+production.
+
+Requires: node and a built `dist/main`. Standard library only on this side.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import itertools
+import json
+import math
+import random
+import re
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+ROOT = Path(__file__).resolve().parents[1]
+DRIVER = Path(__file__).resolve().parent / "capture-jitter.cjs"
+DEFAULT_DIAGNOSTICS = (ROOT / "tests" / "fixtures" / "realtime-failed-run-2026-08-12"
+                       / "audio-diagnostics-session.jsonl")
+
+MAGIC = b"CJIT1\n"
+# Record layout, all float64: kind, a, b, c, byte_length, truth_ms.
+#   mic     a=startPerformanceMs  b=endPerformanceMs
+#   system  a=capturedAtUnixMs    b=observedAtUnixMs  c=observedAtPerformanceMs
+#   session a=epochUnixMs         b=originPerformanceMs
+FIELDS = 6
+MIC, SYSTEM, SESSION = 0, 1, 2
+
+SAMPLE_RATE = 24_000
+MIC_CHUNK_SAMPLES = 2_400                # AUDIO_CHUNK_DURATION, 100 ms
+SYS_CHUNK_SAMPLES = 480                  # 20 ms, as the macOS helper delivers
+MIC_CHUNK_MS = MIC_CHUNK_SAMPLES * 1000 / SAMPLE_RATE
+SYS_CHUNK_MS = SYS_CHUNK_SAMPLES * 1000 / SAMPLE_RATE
+HELPER_AGE_MS = 150.0                    # measured PTS age when the renderer sees it
+HELPER_AGE_SD_MS = 25.0
+MIC_ARRIVAL_MS = 10.0                    # worklet quantum + postMessage
+
+# The 2026-08-22 measurement in capture-timeline.ts, used when the logs hold
+# no rejections of their own.
+MEASURED_BACKWARDS_MS = (5.0, 10.0, 15.0, 18.0, 27.0, 46.8)
+MEASURED_MEDIAN_MS = 10.0
+MEASURED_PER_SESSION = 24
+
+# Not in any log. Ordinary crystal tolerance is +/-20 ppm, and macOS slews the
+# wall clock at up to 500 ppm while NTP corrects it; a step is what a sleep /
+# wake or a manual clock change does.
+PTS_NOISE_MS = 0.3                       # non-atomic Date() / host-clock reads in the helper
+LATE_FRACTION = 0.5                      # of jumps, stamped late rather than early
+MIC_DRIFT_PPM = 15.0
+MIC_GLITCHES_PER_HOUR = 2.0
+MIC_GLITCH_MS = 256 * 1000 / SAMPLE_RATE  # one lost worklet buffer
+WALL_SLEW_PPM = 20.0
+WALL_STEPS_PER_HOUR = 1.0
+WALL_STEP_MEDIAN_MS = 150.0
+
+# A stall the watchdog reports is at least CHUNK_STALL_MS old; with no stall in
+# the logs, assume one an hour of about that length.
+CHUNK_STALL_MS = 8_000.0
+DEFAULT_STALLS_PER_HOUR = 1.0
+
+# The shipped defaults, and the values each one is swept over.
+DEFAULTS = {"maxCaptureClockJitterMs": 250, "maxClockDomainSkewMs": 250, "maxPtsAgeMs": 10_000}
+SWEEP = {
+    "maxCaptureClockJitterMs": (10, 50, 250, 1_000),
+    "maxClockDomainSkewMs": (100, 250, 1_000),
+    "maxPtsAgeMs": (2_000, 10_000, 30_000),
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Calibration
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _lognormal_fit(values: list[float], median: float | None = None,
+                   observations: int | None = None) -> tuple[float, float]:
+    """(mu, sigma) with the given median and the largest value at its rank.
+
+    `observations` is the sample the values were drawn from, when only the
+    distinct values were kept: the measured list is six values out of 24.
+    """
+    median = median or statistics.median(values)
+    top = max(values)
+    n = observations or len(values)
+    z = statistics.NormalDist().inv_cdf(n / (n + 1))
+    sigma = math.log(top / median) / z if top > median and z > 0 else 0.5
+    return math.log(median), sigma
+
+
+def fit(paths: list[Path]) -> dict:
+    """Stream parameters from `appendAudioDiagnostic` JSONL."""
+    span_s = []
+    ready_ms = []
+    stalls_ms: list[float] = []
+    backwards_ms: list[float] = []
+    ref_gap_pct: list[float] = []
+    for path in paths:
+        records = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+        times = [datetime.fromisoformat(r["at"].replace("Z", "+00:00")).timestamp() for r in records]
+        if times:
+            span_s.append(max(times) - min(times))
+        for record in records:
+            event = record.get("event")
+            if event == "system_audio_ready" and isinstance(record.get("readyInMs"), (int, float)):
+                ready_ms.append(float(record["readyInMs"]))
+            elif event == "system_audio_stall" and isinstance(record.get("ageMs"), (int, float)):
+                stalls_ms.append(float(record["ageMs"]))
+            message = record.get("message") or ""
+            backwards_ms += [float(m) for m in re.findall(r"moved backwards by ([\d.]+)ms", message)]
+            ref_gap_pct += [float(m) for m in re.findall(r"refGap=([\d.]+)%", message)]
+
+    session_s = statistics.median(span_s) if span_s else 300.0
+    sessions = max(1, len(paths))
+    if backwards_ms:
+        mu, sigma = _lognormal_fit(backwards_ms)
+        jumps_per_session = len(backwards_ms) / sessions
+        jump_source = "logs"
+    else:
+        mu, sigma = _lognormal_fit(list(MEASURED_BACKWARDS_MS), MEASURED_MEDIAN_MS,
+                                   MEASURED_PER_SESSION)
+        jumps_per_session = MEASURED_PER_SESSION
+        jump_source = "capture-timeline.ts 2026-08-22"
+    if stalls_ms:
+        stall_mu, stall_sigma = _lognormal_fit(stalls_ms)
+        stalls_per_hour = len(stalls_ms) / (sum(span_s) / 3600)
+    else:
+        stall_mu, stall_sigma = math.log(CHUNK_STALL_MS), 0.25
+        stalls_per_hour = DEFAULT_STALLS_PER_HOUR
+    return {
+        "session_s": session_s,
+        "system_start_ms": statistics.median(ready_ms) if ready_ms else 3_000.0,
+        "jump_mu": mu,
+        "jump_sigma": sigma,
+        "jumps_per_session": jumps_per_session,
+        "jump_source": jump_source,
+        "stall_mu": stall_mu,
+        "stall_sigma": stall_sigma,
+        "stalls_per_hour": stalls_per_hour,
+        "ref_gap_fraction": statistics.fmean(ref_gap_pct) / 100 if ref_gap_pct else 0.0,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Streams
+# ─────────────────────────────────────────────────────────────────────────────
+
+class _WallClock:
+    """Date.now() minus performance.now(), relative to session start."""
+
+    def __init__(self, rng: random.Random, session_ms: float) -> None:
+        count = _poisson(rng, WALL_STEPS_PER_HOUR * session_ms / 3_600_000)
+        self.at = sorted(rng.uniform(0, session_ms) for _ in range(count))
+        self.offset = list(itertools.accumulate(
+            rng.choice((-1, 1)) * rng.lognormvariate(math.log(WALL_STEP_MEDIAN_MS), 0.8)
+            for _ in range(count)))
+
+    def __call__(self, t_ms: float) -> float:
+        i = bisect.bisect_right(self.at, t_ms)
+        return t_ms * WALL_SLEW_PPM * 1e-6 + (self.offset[i - 1] if i else 0.0)
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    count, p, limit = 0, 1.0, math.exp(-lam)
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return count
+        count += 1
+
+
+def _mic(rng: random.Random, session_ms: float, origin: float) -> Iterator[tuple[float, tuple]]:
+    real_ms = MIC_CHUNK_MS * (1 - MIC_DRIFT_PPM * 1e-6)
+    p_glitch = MIC_GLITCHES_PER_HOUR * MIC_CHUNK_MS / 3_600_000
+    true_start = 0.0
+    n = 0
+    while true_start < session_ms:
+        if rng.random() < p_glitch:
+            true_start += MIC_GLITCH_MS
+        start = origin + n * MIC_CHUNK_MS
+        arrival = origin + true_start + real_ms + MIC_ARRIVAL_MS
+        yield arrival, (MIC, start, start + MIC_CHUNK_MS, 0.0, MIC_CHUNK_SAMPLES * 2, true_start)
+        true_start += real_ms
+        n += 1
+
+
+def _system(rng: random.Random, cal: dict, drift_ppm: float, session_ms: float,
+            epoch: float, origin: float, wall: _WallClock) -> Iterator[tuple[float, tuple]]:
+    real_ms = SYS_CHUNK_MS * (1 - drift_ppm * 1e-6)
+    per_chunk = SYS_CHUNK_MS / 1000
+    p_jump = cal["jumps_per_session"] / cal["session_s"] * per_chunk
+    p_stall = cal["stalls_per_hour"] / 3600 * per_chunk
+    p_gap = cal["ref_gap_fraction"]
+    true_start = cal["system_start_ms"]
+    stall_until = -math.inf
+    burst = 0
+    last_arrival = -math.inf
+    while true_start < session_ms:
+        if p_gap and rng.random() < p_gap:
+            true_start += real_ms
+            continue
+        noise = rng.gauss(0.0, PTS_NOISE_MS)
+        if rng.random() < p_jump:
+            jump = rng.lognormvariate(cal["jump_mu"], cal["jump_sigma"])
+            noise += jump if rng.random() < LATE_FRACTION else -jump
+        if rng.random() < p_stall:
+            stall_until = true_start + rng.lognormvariate(cal["stall_mu"], cal["stall_sigma"])
+            burst = 0
+        age = max(5.0, rng.gauss(HELPER_AGE_MS, HELPER_AGE_SD_MS))
+        arrival_rel = true_start + real_ms + age
+        if true_start + real_ms < stall_until:
+            # A stalled helper delivers its backlog in one burst when it resumes.
+            burst += 1
+            arrival_rel = stall_until + age + burst * 0.01
+        # One pipe from the helper: age varies, delivery order does not.
+        arrival_rel = last_arrival = max(arrival_rel, last_arrival + 0.01)
+        captured = epoch + true_start + wall(true_start) + noise
+        observed_unix = epoch + arrival_rel + wall(arrival_rel)
+        yield origin + arrival_rel, (SYSTEM, captured, observed_unix, origin + arrival_rel,
+                                     SYS_CHUNK_SAMPLES * 2, true_start)
+        true_start += real_ms
+
+
+def generate(chunks: int, seed: int, cal: dict, drift_ppm: float) -> Iterator[tuple]:
+    """Sessions of mic and system records in arrival order, `chunks` records in all."""
+    rng = random.Random(seed)
+    session_ms = cal["session_s"] * 1000
+    emitted = 0
+    session = 0
+    while emitted < chunks:
+        epoch = 1_756_000_000_000.0 + session * 86_400_000.0
+        origin = 5_000.0 + rng.uniform(0, 60_000)
+        yield (SESSION, epoch, origin, float(session), 0.0, 0.0)
+        wall = _WallClock(rng, session_ms)
+        merged = sorted(itertools.chain(_mic(rng, session_ms, origin),
+                                        _system(rng, cal, drift_ppm, session_ms, epoch, origin, wall)),
+                        key=lambda item: item[0])
+        for _, record in merged[: chunks - emitted]:
+            yield record
+        emitted += min(len(merged), chunks - emitted)
+        session += 1
+
+
+def write_stream(path: Path, chunks: int, seed: int, cal: dict, drift_ppm: float) -> None:
+    header = json.dumps({"chunks": chunks, "seed": seed, "drift_ppm": drift_ppm,
+                         "fields": FIELDS, "calibration": cal}).encode()
+    pad = -(len(MAGIC) + 4 + len(header)) % 8
+    with path.open("wb") as out:
+        out.write(MAGIC + struct.pack("<I", len(header) + pad) + header + b" " * pad)
+        block = array("d")
+        for record in generate(chunks, seed, cal, drift_ppm):
+            block.extend(record)
+            if len(block) >= 60_000:
+                out.write(block.tobytes())
+                block = array("d")
+        out.write(block.tobytes())
+
+
+def settings(grid: bool) -> list[dict]:
+    if grid:
+        keys = list(SWEEP)
+        return [dict(zip(keys, values)) for values in itertools.product(*SWEEP.values())]
+    out = [dict(DEFAULTS)]
+    for key, values in SWEEP.items():
+        out += [{**DEFAULTS, key: v} for v in values if v != DEFAULTS[key]]
+    return out
+
+
+def _label(setting: dict) -> str:
+    marks = [f"{name}={setting[key]}" for key, name in
+             (("maxCaptureClockJitterMs", "jitter"), ("maxClockDomainSkewMs", "skew"), ("maxPtsAgeMs", "age"))
+             if setting[key] != DEFAULTS[key]]
+    return " ".join(marks) or "shipped defaults"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="capture-timeline clock-domain jitter replay")
+    parser.add_argument("--chunks", type=int, default=2_000_000, help="mic + system chunks in the stream")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--diagnostics", type=Path, action="append",
+                        help=f"audio-diagnostics JSONL to fit from (repeatable; default {DEFAULT_DIAGNOSTICS.name})")
+    parser.add_argument("--drift-ppm", type=float, default=10.0,
+                        help="system audio clock against the host clock; positive runs fast")
+    parser.add_argument("--grid", action="store_true", help="every combination, not one axis at a time")
+    parser.add_argument("--write", type=Path, help="only write the generated stream to this file")
+    args = parser.parse_args()
+
+    cal = fit(args.diagnostics or [DEFAULT_DIAGNOSTICS])
+    if args.write:
+        write_stream(args.write, args.chunks, args.seed, cal, args.drift_ppm)
+        print(f"wrote {args.chunks} chunks to {args.write}")
+        return 0
+
+    print("=" * 68)
+    print(f"  CAPTURE CLOCK JITTER REPLAY - {args.chunks} chunks, seed {args.seed}")
+    print("=" * 68)
+    print(f"  session {cal['session_s']:.0f}s, system ready after {cal['system_start_ms']:.0f}ms, "
+          f"ref gaps {cal['ref_gap_fraction']:.1%}")
+    print(f"  jumps   {cal['jumps_per_session']:.0f}/session, median {math.exp(cal['jump_mu']):.1f}ms, "
+          f"sigma {cal['jump_sigma']:.2f}  ({cal['jump_source']})")
+    print(f"  stalls  {cal['stalls_per_hour']:.1f}/hour, median {math.exp(cal['stall_mu']) / 1000:.1f}s; "
+          f"system drift {args.drift_ppm:+.0f} ppm, mic {MIC_DRIFT_PPM:+.0f} ppm")
+
+    sweep = settings(args.grid)
+    with tempfile.TemporaryDirectory() as tmp:
+        stream = Path(tmp) / "chunks.bin"
+        write_stream(stream, args.chunks, args.seed, cal, args.drift_ppm)
+        node = subprocess.run(
+            ["node", str(DRIVER), str(stream), f"--settings={json.dumps(sweep)}"],
+            capture_output=True, text=True, cwd=str(ROOT),
+        )
+    if node.returncode != 0:
+        print(node.stdout + node.stderr)
+        sys.exit("driver failed")
+
+    results = [json.loads(line) for line in node.stdout.splitlines() if line.startswith("{")]
+    if len(results) != len(sweep):
+        sys.exit(f"driver reported {len(results)} of {len(sweep)} settings")
+
+    sessions = results[0]["sessions"]
+    print(f"\n  {sessions} sessions; error is |capture_start_ms - true capture time|, system side\n")
+    print(f"  {'setting':<22} {'Mchunk/s':>8} {'sys drop':>9} {'mic drop':>9} {'clamp/ses':>9} "
+          f"{'p50 ms':>7} {'p99 ms':>7} {'max ms':>8} {'end ms':>7}")
+    for r in results:
+        e = r["error"]["system"]
+        print(f"  {_label(r['setting']):<22} {r['chunksPerSec'] / 1e6:8.2f} "
+              f"{r['rejectRate']['system']:9.3%} {r['rejectRate']['mic']:9.3%} "
+              f"{r['clamped']['system'] / sessions:9.0f} "
+              f"{e['p50']:7.2f} {e['p99']:7.2f} {e['max']:8.1f} {e['meanEnd']:7.2f}")
+
+    print("\n  drops by reason, per session")
+    print(f"  {'setting':<22} {'backwards':>10} {'skew':>8} {'pts age':>8}")
+    for r in results:
+        reasons = r["reasons"]
+        print(f"  {_label(r['setting']):<22} {reasons.get('backwards', 0) / sessions:10.2f} "
+              f"{reasons.get('skew', 0) / sessions:8.2f} {reasons.get('pts-age', 0) / sessions:8.2f}")
+
+    mic = results[0]["error"]["mic"]
+    print("\n" + "-" * 68)
+    print(f"  MIC (sample-counted, never dropped)   error p99 {mic['p99']:.2f}ms, "
+          f"max {mic['max']:.1f}ms, at session end {mic['meanEnd']:.2f}ms")
+    print("-" * 68)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
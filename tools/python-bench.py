@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""Have the Python tools got slower or hungrier?
+
+    python3 tools/python-bench.py              # compare against the stored baseline
+    python3 tools/python-bench.py --update     # measure and store this host's baseline
+    python3 tools/python-bench.py --only gate  # one group: icon, tray, gate
+
+Nothing measured the Python entry points, so a change that made the tray mark
+take a minute to render, or the gate's correlation allocate a gigabyte, would
+only be noticed by whoever happened to run it next. This runs each one on fixed
+synthetic input and fails when wall time or peak memory regresses past a
+threshold against a stored baseline.
+
+It runs headless, with no audio device and no sox:
+
+  * `round_icon()` gets a generated 1100x1000 icon with the grey border its
+    crop loop exists to remove - the per-pixel Python loop is the cost;
+  * `render()` draws the tray mark at the shipped @1x and @3x sizes;
+  * the gate's `measure()` - FFT correlation and coherence - gets the
+    committed `tools/aec-speech/far.wav` played through a synthetic room
+    (the same construction as `aec-lab.cjs`: 60 ms delay, early reflections,
+    150 ms RT60 tail, 19 dB ERL) instead of a speaker and a microphone.
+
+Each benchmark runs in its own child process, so one cannot inherit another's
+warm caches or heap. Wall time is the best of the repeats, because the minimum
+is the number least disturbed by whatever else the machine is doing. It is
+compared as a multiple of a fixed calibration workload - an interpreter loop
+and an FFT, the two kinds of work the tools do - timed in the same child,
+interleaved with the repeats, so both see the same machine at the same moment.
+That is what lets a baseline taken on one machine mean something on a faster
+or slower one of the same kind, and keeps a noisy neighbour from reading as a
+regression. Peak
+memory is the `tracemalloc` high-water mark, which numpy reports into; Pillow's
+C-side pixel buffers are not visible to it, so `round_icon` is measured on what
+Python itself allocates.
+
+Baselines are versioned twice over. `BENCH_VERSION` is in the file name and
+changes whenever a workload changes, so numbers for different inputs are never
+compared. Inside the file they are keyed by OS and architecture only: Pillow
+and numpy take different code paths on arm64 and x86_64, so those never share
+numbers, but CPU count does not matter to single-threaded work and calibration
+absorbs clock speed. The Python and numpy versions are stored alongside and a
+mismatch is printed, because a new interpreter legitimately moves the memory
+numbers. Only `--update` writes the file; a host class with no baseline reports
+NO BASELINE and exits 2, so a run never passes by comparing against itself,
+and never dirties the working tree.
+
+The committed `Linux-x86_64` baseline is what `.github/workflows/python-bench.yml`
+checks on every change to the Python tools.
+
+Requires: numpy, scipy, Pillow.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import io
+import json
+import multiprocessing
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from contextlib import redirect_stdout
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BENCH_VERSION = 1
+BASELINE = Path(__file__).resolve().parent / "bench-baselines" / f"python-v{BENCH_VERSION}.json"
+
+# Allowed growth over the baseline before a run fails. Wall time is noisier
+# than memory - scheduler, thermal state - so it gets more room.
+MAX_WALL_REGRESSION = 0.25
+MAX_MEMORY_REGRESSION = 0.10
+
+
+def _load(name: str, path: Path):
+    """Import a tool by path; several have hyphens in their file names."""
+    sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Workloads. Each returns a zero-argument callable; setup is not timed.
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _round_icon():
+    from PIL import Image, ImageDraw
+
+    icon = _load("round_icon", ROOT / "scripts" / "round-icon.py")
+    scratch = tempfile.TemporaryDirectory(prefix="python-bench-")
+    tmp = Path(scratch.name)
+    # Grey border (inside the crop loop's 225-245 band) around coloured
+    # artwork, non-square so the centre crop and the resize both run.
+    img = Image.new("RGBA", (1100, 1000), (235, 235, 235, 255))
+    ImageDraw.Draw(img).ellipse((120, 90, 980, 910), fill=(40, 90, 200, 255))
+    src = tmp / "in.png"
+    img.save(src)
+
+    def run():
+        with redirect_stdout(io.StringIO()):
+            icon.round_icon(str(src), str(tmp / "out.png"))
+    # Held by the callable, so the directory lives exactly as long as the
+    # child process that times it, and is removed when it exits.
+    run.scratch = scratch
+    return run
+
+
+def _tray(px: int):
+    def setup():
+        mark = _load("gen_tray_mark", ROOT / "scripts" / "gen_tray_mark.py")
+        return lambda: mark.render(px)
+    return setup
+
+
+def _room_echo():
+    """Far end at the gate's rate, and what a room returns of it."""
+    import numpy as np
+    from scipy import signal
+
+    gate = _load("aec_hardware_gate", ROOT / "tools" / "aec-hardware-gate.py")
+    rate = gate.RATE
+    with wave.open(str(gate.SPEECH)) as w:
+        pcm = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+        src_rate = w.getframerate()
+    x = signal.resample_poly(pcm.astype(np.float32) / 32768.0, rate, src_rate)
+    x = x[: rate * gate.SECONDS].astype(np.float32)
+
+    rng = np.random.default_rng(4242)
+    delay = round(0.060 * rate)
+    tail = round(0.150 * rate)
+    ir = np.zeros(delay + tail + 1, dtype=np.float32)
+    ir[delay] = 1.0
+    for ms, gain in ((1.4, 0.52), (3.1, -0.38), (5.7, 0.27), (9.3, -0.19), (14.6, 0.13)):
+        ir[delay + round(ms / 1000 * rate)] += gain
+    t = np.arange(tail) / rate
+    ir[delay:delay + tail] += (rng.uniform(-1, 1, tail) * 0.22 * np.exp(-6.9078 * t / 0.150)).astype(np.float32)
+    y = signal.fftconvolve(x, ir)[: len(x)]
+    y *= np.sqrt(np.mean(x ** 2) / max(np.mean(y ** 2), 1e-20)) * 10 ** (-19 / 20)
+    y += rng.normal(0, 1e-4, len(y))
+    return gate, x, y.astype(np.float32)
+
+
+def _gate_measure():
+    gate, x, y = _room_echo()
+    return lambda: gate.measure(x, y)
+
+
+def _calibration():
+    """Fixed work that moves with the machine, not with this repo's code."""
+    import numpy as np
+
+    x = np.random.default_rng(7).standard_normal(1 << 18)
+
+    def run():
+        total = 0
+        for i in range(200_000):
+            total += i & 7
+        np.fft.irfft(np.fft.rfft(x) * np.fft.rfft(x[::-1]))
+        return total
+    return run
+
+
+BENCHMARKS = {
+    # name: (group, setup, repeats)
+    "icon.round_icon": ("icon", _round_icon, 3),
+    "tray.render@16": ("tray", _tray(16), 3),
+    "tray.render@48": ("tray", _tray(48), 1),
+    "gate.measure": ("gate", _gate_measure, 5),
+}
+CALIBRATION_REPEATS = 3
+
+
+def _best_of(run, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _child(name: str, queue) -> None:
+    _, setup, repeats = BENCHMARKS[name]
+    run = setup()
+    calibrate = _calibration()
+    run()  # warm: imports, FFT plans, first-touch pages
+    calibrate()
+    best = float("inf")
+    calibration = float("inf")
+    peak = 0
+    for _ in range(repeats):
+        calibration = min(calibration, _best_of(calibrate, CALIBRATION_REPEATS))
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    queue.put({"wall_s": best, "calibration_s": calibration, "peak_bytes": peak})
+
+
+def measure_one(name: str) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(name, queue))
+    proc.start()
+    proc.join()
+    if proc.exitcode != 0:
+        raise RuntimeError(f"{name} exited with {proc.exitcode}")
+    return queue.get()
+
+
+def host_key() -> str:
+    return f"{platform.system()}-{platform.machine()}"
+
+
+def versions() -> dict:
+    import numpy
+
+    return {"python": ".".join(platform.python_version_tuple()[:2]), "numpy": numpy.__version__}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Python tooling benchmark regression suite")
+    parser.add_argument("--update", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--only", choices=sorted({g for g, _, _ in BENCHMARKS.values()}))
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    args = parser.parse_args()
+
+    names = [n for n, (group, _, _) in BENCHMARKS.items() if args.only in (None, group)]
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if stored and stored.get("bench_version") != BENCH_VERSION:
+        sys.exit(f"{args.baseline} is for bench version {stored.get('bench_version')}, not {BENCH_VERSION}")
+    host = host_key()
+    baseline = stored.get("hosts", {}).get(host, {})
+    here = versions()
+
+    print("=" * 78)
+    print(f"  PYTHON TOOLING BENCH v{BENCH_VERSION}  host {host}  "
+          f"python {here['python']}  numpy {here['numpy']}")
+    print("=" * 78)
+    if baseline.get("versions", here) != here:
+        print(f"  note: baseline was measured with python {baseline['versions']['python']}, "
+              f"numpy {baseline['versions']['numpy']} - memory may differ for that reason alone")
+    print(f"  {'benchmark':<18} {'wall':>9} {'x cal':>7} {'base':>7} {'delta':>7}   "
+          f"{'peak MB':>8} {'base':>8} {'delta':>7}")
+
+    results = {}
+    failures = []
+    missing = []
+    mark = lambda d, limit: f"\x1b[31m{d:+6.0%}\x1b[0m" if d > limit else f"{d:+6.0%}"
+    for name in names:
+        r = measure_one(name)
+        results[name] = r
+        rel = r["wall_s"] / r["calibration_s"]
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            missing.append(name)
+            print(f"  {name:<18} {r['wall_s']:8.3f}s {rel:7.2f} {'-':>7} {'':>7}   "
+                  f"{r['peak_bytes'] / 1e6:8.1f} {'-':>8}")
+            continue
+        base_rel = base["wall_s"] / base["calibration_s"]
+        dw = rel / base_rel - 1
+        dm = r["peak_bytes"] / max(base["peak_bytes"], 1) - 1
+        print(f"  {name:<18} {r['wall_s']:8.3f}s {rel:7.2f} {base_rel:7.2f} {mark(dw, MAX_WALL_REGRESSION)}   "
+              f"{r['peak_bytes'] / 1e6:8.1f} {base['peak_bytes'] / 1e6:8.1f} {mark(dm, MAX_MEMORY_REGRESSION)}")
+        if dw > MAX_WALL_REGRESSION:
+            failures.append(f"{name}: wall time {dw:+.0%} over baseline, relative to calibration")
+        if dm > MAX_MEMORY_REGRESSION:
+            failures.append(f"{name}: peak memory {dm:+.0%} over baseline")
+
+    if args.update:
+        hosts = stored.get("hosts", {})
+        benchmarks = {**baseline.get("benchmarks", {}), **results} if args.only else results
+        hosts[host] = {"versions": here, "benchmarks": benchmarks}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(
+            {"bench_version": BENCH_VERSION, "hosts": hosts}, indent=2, sort_keys=True) + "\n")
+        print(f"\n  baseline updated for {host}: {args.baseline}")
+        return 0
+
+    if failures:
+        print("\n  REGRESSED")
+        for line in failures:
+            print(f"    - {line}")
+        return 1
+    if missing:
+        print(f"\n  NO BASELINE for {host}: {', '.join(missing)}")
+        known = ", ".join(sorted(stored.get("hosts", {}))) or "none"
+        print(f"    stored hosts: {known}")
+        print("    measure one on a machine of this kind with --update and commit it")
+        return 2
+    print("\n  PASS - no benchmark regressed past its threshold")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""What happens to every open call when the backend restarts?
+
+    python3 tools/reconnect-storm.py                        # 50 desktops, graceful restart
+    python3 tools/reconnect-storm.py --desktops 200 --mode kill --downtime 10
+    python3 tools/reconnect-storm.py --provider-slots 8 --jitter full
+
+Our worst incidents are not one flaky socket - `test-desktop-ascended.py`
+already shows one idle socket surviving 40 s - but a backend restart, when
+every desktop in the field loses both its sockets in the same second and comes
+back at once. This holds N desktops open against the local mock
+(`ws_mock.py`), each streaming mic and system audio, then stops the endpoint
+and brings it back, and measures how long it takes until every socket is
+transcribing again and how much audio did not survive.
+
+Each socket replays `ChatWebSocket` in `src/renderer/services/websocketService.ts`
+rather than an idealised client, because the timing IS the behaviour under
+test:
+
+  * a socket is only usable after `status`/`dg_open`, and an attempt that has
+    not seen it within 15 s is abandoned;
+  * after a ready socket closes, `scheduleReconnect` waits
+    `min(1000 * 2**attempts, 15000)` ms, with no jitter; a failed attempt
+    schedules the next one; only `dg_open` resets `attempts`;
+  * audio captured while not ready is queued, at most the newest 120 s
+    (`MAX_QUEUED_AUDIO_MS`), and flushed in order on `dg_open`; an audio
+    chunk arriving while there is no socket schedules a reconnect.
+
+`connectionMonitor.ts` (a /health poll every 30 s) and the warm-up heartbeat
+in `connection-warmup.ts` do not touch `/ws/transcribe`, so they are not
+modelled: during a restart they only decide when a toast appears.
+
+`--jitter full` swaps the fixed delays for `uniform(0, delay)` to see what the
+herd would cost with it; the default is what ships.
+
+The mock's `--ready-delay` / `--provider-slots` stand in for the Deepgram
+connect the real backend makes per socket: with a slot limit, a herd arriving
+in one instant queues there, and that queue is the recovery time. Everything
+runs in one event loop, so at a few thousand sockets this process, not the
+protocol, becomes the bottleneck - watch the capture-late column.
+
+Requires: websockets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+
+import websockets
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from ws_mock import MockTranscribeServer  # noqa: E402
+
+# From websocketService.ts: the setTimeout(..., 15000) in connect(), the
+# 1000 * 2^attempt delay capped at MAX_DELAY in scheduleReconnect(), and
+# MAX_QUEUED_AUDIO_MS in the send queue. All are literals there, not exports.
+PROVIDER_READY_TIMEOUT_S = 15.0
+RECONNECT_BASE_S = 1.0
+RECONNECT_MAX_S = 15.0
+MAX_QUEUED_AUDIO_MS = 120_000
+SAMPLE_RATE = 24_000
+
+# Time allowed after capture stops for the last sends to land before the
+# mock's counters are read.
+DRAIN_S = 1.0
+
+
+class DesktopSocket:
+    """One `ChatWebSocket`: transport, readiness, backoff and the audio queue."""
+
+    def __init__(self, url: str, session_id: str, source: str, chunk_ms: int,
+                 jitter: bool, rng: random.Random) -> None:
+        self.url = f"{url}/ws/transcribe?chat_id=4711&token=storm&source={source}&sample_rate={SAMPLE_RATE}&capture_protocol=1"
+        self.session_id = session_id
+        self.source = source
+        self.chunk_ms = chunk_ms
+        self.jitter = jitter
+        self.rng = rng
+        self.ws = None
+        self.ready = False
+        self.connecting = False
+        self.should_reconnect = True
+        self.attempts = 0
+        self.timer: asyncio.Task | None = None
+        self.queue: deque[tuple[str, bytes, float]] = deque()
+        self.queued_ms = 0.0
+        self._send_lock = asyncio.Lock()
+        self._reader: asyncio.Task | None = None
+        self.epoch_ms = time.time() * 1000
+        # Measurements.
+        self.captured_ms = 0.0
+        self.dropped_ms = 0.0
+        self.connects = 0
+        self.failures = 0
+        self.late_ms = 0.0
+        self.down_at: float | None = None
+        self.outages: list[tuple[float, float | None, int]] = []  # (down, up, attempts)
+
+    # ── transport ───────────────────────────────────────────────────────────
+
+    async def connect(self) -> None:
+        self.connecting = True
+        self.connects += 1
+        try:
+            ws = await asyncio.wait_for(self._open(), PROVIDER_READY_TIMEOUT_S)
+        finally:
+            self.connecting = False
+        async with self._send_lock:
+            self.ws = ws
+            attempts, self.attempts = self.attempts, 0
+            while self.queue:
+                meta, pcm, ms = self.queue.popleft()
+                self.queued_ms -= ms
+                await self._send_pair(meta, pcm)
+            self.ready = True
+        if self.down_at is not None:
+            self.outages.append((self.down_at, time.monotonic(), attempts))
+            self.down_at = None
+        self._reader = asyncio.create_task(self._read(ws))
+
+    async def _open(self):
+        ws = await websockets.connect(self.url, open_timeout=None, ping_interval=None, max_size=None)
+        try:
+            async for frame in ws:
+                if isinstance(frame, str):
+                    message = json.loads(frame)
+                    if message.get("type") == "status" and (message.get("data") or {}).get("dg_open") is True:
+                        return ws
+            raise ConnectionError(f"closed before provider ready ({ws.close_code})")
+        except BaseException:
+            ws.transport.abort()
+            raise
+
+    async def _read(self, ws) -> None:
+        try:
+            async for _ in ws:
+                pass
+        except websockets.ConnectionClosed:
+            pass
+        if self.ws is ws:
+            self.ws = None
+            self.ready = False
+            self.down_at = time.monotonic()
+            if self.should_reconnect:
+                self.schedule_reconnect()
+
+    def schedule_reconnect(self) -> None:
+        if self.timer is not None:
+            return
+        delay = min(RECONNECT_BASE_S * 2 ** self.attempts, RECONNECT_MAX_S)
+        if self.jitter:
+            delay = self.rng.uniform(0, delay)
+        self.timer = asyncio.create_task(self._reconnect_after(delay))
+
+    async def _reconnect_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self.timer = None
+        self.attempts += 1
+        try:
+            await self.connect()
+        except (OSError, ConnectionError, asyncio.TimeoutError, websockets.WebSocketException):
+            self.failures += 1
+            if self.should_reconnect:
+                self.schedule_reconnect()
+
+    async def _send_pair(self, meta: str, pcm: bytes) -> None:
+        try:
+            await self.ws.send(meta)
+            await self.ws.send(pcm)
+        except websockets.ConnectionClosed:
+            # A browser socket that is CLOSING discards sends silently; so
+            # does this. What the server never received is counted as lost.
+            pass
+
+    # ── capture ─────────────────────────────────────────────────────────────
+
+    async def capture(self, stop: asyncio.Event) -> None:
+        """Emit one chunk per `chunk_ms` on a steady clock, as the worklet does."""
+        pcm = bytes(SAMPLE_RATE * self.chunk_ms // 1000 * 2)
+        start = time.monotonic()
+        seq = 0
+        while not stop.is_set():
+            meta = json.dumps({
+                "command": "audio_chunk_meta", "schema_version": 1,
+                "capture_session_id": self.session_id, "capture_generation": 0,
+                "source": self.source, "chunk_seq": seq,
+                "capture_start_ms": seq * self.chunk_ms, "capture_end_ms": (seq + 1) * self.chunk_ms,
+                "session_epoch_ms": self.epoch_ms, "sample_rate": SAMPLE_RATE, "channel_count": 1,
+                "bytes_per_sample": 2, "sample_count": len(pcm) // 2, "byte_length": len(pcm),
+            })
+            self.captured_ms += self.chunk_ms
+            async with self._send_lock:
+                if self.ready:
+                    await self._send_pair(meta, pcm)
+                else:
+                    self._enqueue(meta, pcm)
+            seq += 1
+            due = start + seq * self.chunk_ms / 1000
+            lag = time.monotonic() - due
+            if lag > 0:
+                self.late_ms = max(self.late_ms, lag * 1000)
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+
+    def _enqueue(self, meta: str, pcm: bytes) -> None:
+        self.queue.append((meta, pcm, self.chunk_ms))
+        self.queued_ms += self.chunk_ms
+        while self.queued_ms > MAX_QUEUED_AUDIO_MS and self.queue:
+            _, _, ms = self.queue.popleft()
+            self.queued_ms -= ms
+            self.dropped_ms += ms
+        if self.ws is None and not self.connecting and self.should_reconnect:
+            self.schedule_reconnect()
+
+    async def close(self) -> None:
+        self.should_reconnect = False
+        if self.timer is not None:
+            self.timer.cancel()
+        if self.ws is not None:
+            ws, self.ws = self.ws, None
+            self.ready = False
+            await ws.close(1000, "User stopped")
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+
+def _pct(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+
+
+def _peak_rate(times: list[float], window_s: float = 1.0) -> int:
+    """Most handshakes seen in any `window_s` interval."""
+    times = sorted(times)
+    best = lo = 0
+    for hi, t in enumerate(times):
+        while t - times[lo] > window_s:
+            lo += 1
+        best = max(best, hi - lo + 1)
+    return best
+
+
+async def run_storm(args: argparse.Namespace) -> int:
+    server = MockTranscribeServer(port=args.port, ready_delay_s=args.ready_delay,
+                                  provider_slots=args.provider_slots)
+    await server.start()
+    rng = random.Random(args.seed)
+    sockets = [DesktopSocket(server.url, str(uuid.UUID(int=rng.getrandbits(128))), source,
+                             args.chunk_ms, args.jitter == "full", rng)
+               for _ in range(args.desktops) for source in ("mic", "system")]
+
+    print("=" * 68)
+    print(f"  RECONNECT STORM  {args.desktops} desktops / {len(sockets)} sockets, "
+          f"{args.mode} with {args.downtime:.1f}s downtime")
+    print(f"  provider connect {args.ready_delay:.2f}s, slots {args.provider_slots or 'unbounded'}, "
+          f"backoff {'full jitter' if args.jitter == 'full' else 'as shipped'}")
+    print("=" * 68)
+
+    stop = asyncio.Event()
+    capture = [asyncio.create_task(s.capture(stop)) for s in sockets]
+
+    async def first_connect(s: DesktopSocket, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            await s.connect()
+        except (OSError, ConnectionError, asyncio.TimeoutError, websockets.WebSocketException):
+            s.failures += 1
+            s.schedule_reconnect()
+
+    async def shut_down(drain_s: float) -> None:
+        stop.set()
+        await asyncio.gather(*capture)
+        await asyncio.sleep(drain_s)
+        await asyncio.gather(*(s.close() for s in sockets))
+        await server.stop()
+
+    await asyncio.gather(*(first_connect(s, rng.uniform(0, args.ramp)) for s in sockets))
+    deadline = time.monotonic() + PROVIDER_READY_TIMEOUT_S
+    while not all(s.ready for s in sockets) and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    if not all(s.ready for s in sockets):
+        print(f"  only {sum(s.ready for s in sockets)}/{len(sockets)} sockets came up; not storming")
+        # Nothing is measured, so no drain - but the capture tasks, sockets
+        # and their reconnect timers still have to stop before the loop does.
+        await shut_down(0.0)
+        return 2
+    print(f"  all {len(sockets)} sockets ready; holding {args.hold:.1f}s")
+    await asyncio.sleep(args.hold)
+
+    storm_at = time.monotonic()
+    handshakes_before = len(server.handshake_times)
+    server.peak_pending = server.pending
+    await server.restart(args.downtime, abort=args.mode == "kill")
+    print(f"  endpoint back after {time.monotonic() - storm_at:.1f}s; waiting for recovery")
+
+    deadline = storm_at + args.timeout
+    while time.monotonic() < deadline:
+        if all(s.ready and s.outages and s.outages[-1][0] >= storm_at for s in sockets):
+            break
+        await asyncio.sleep(0.05)
+    recovered_at = time.monotonic()
+
+    await asyncio.sleep(args.settle)
+    await shut_down(DRAIN_S)
+
+    # ── report ──────────────────────────────────────────────────────────────
+    storm_outages = [next((o for o in s.outages if o[0] >= storm_at), None) for s in sockets]
+    recovered = [o for o in storm_outages if o is not None and o[1] is not None]
+    recovery_s = [o[1] - storm_at for o in recovered]
+    attempts = [o[2] for o in recovered]
+    lost_s = [(s.captured_ms - server.received_ms.get((s.session_id, s.source), 0.0)) / 1000 for s in sockets]
+    dropped_s = [s.dropped_ms / 1000 for s in sockets]
+    storm_handshakes = server.handshake_times[handshakes_before:]
+
+    print()
+    print(f"  {'':<28} {'p50':>9} {'p95':>9} {'max':>9}")
+    print(f"  {'recovery after storm (s)':<28} {_pct(recovery_s, .5):9.2f} {_pct(recovery_s, .95):9.2f} "
+          f"{max(recovery_s, default=float('nan')):9.2f}")
+    print(f"  {'attempts until dg_open':<28} {_pct(attempts, .5):9.0f} {_pct(attempts, .95):9.0f} "
+          f"{max(attempts, default=0):9.0f}")
+    print(f"  {'lost audio per socket (s)':<28} {_pct(lost_s, .5):9.2f} {_pct(lost_s, .95):9.2f} {max(lost_s):9.2f}")
+    print(f"  {'  of which queue overflow':<28} {_pct(dropped_s, .5):9.2f} {_pct(dropped_s, .95):9.2f} "
+          f"{max(dropped_s):9.2f}")
+    print(f"  {'capture late (ms)':<28} {_pct([s.late_ms for s in sockets], .5):9.1f} "
+          f"{_pct([s.late_ms for s in sockets], .95):9.1f} {max(s.late_ms for s in sockets):9.1f}")
+    print()
+    print(f"  handshakes after storm       {len(storm_handshakes)}  "
+          f"(failed attempts {sum(s.failures for s in sockets)})")
+    print(f"  peak handshakes in 1 s       {_peak_rate(storm_handshakes)}")
+    print(f"  peak concurrent handshakes   {server.peak_pending}  (accepted, waiting for dg_open)")
+    print(f"  lost audio, all sockets      {sum(lost_s):.1f}s of {sum(s.captured_ms for s in sockets) / 1000:.0f}s captured")
+
+    def recovery_of(i: int) -> float:
+        o = storm_outages[i]
+        return o[1] - storm_at if o and o[1] else float("inf")
+
+    worst = sorted(range(len(sockets)), key=lambda i: (-lost_s[i], -recovery_of(i)))[:5]
+    print()
+    print(f"  {'worst sockets':<22} {'lost s':>8} {'dropped s':>10} {'recovery s':>11} {'attempts':>9}")
+    for i in worst:
+        s, o = sockets[i], storm_outages[i]
+        rec = f"{recovery_of(i):11.2f}" if o and o[1] else f"{'never':>11}"
+        print(f"  {s.session_id[:8] + ' ' + s.source:<22} {lost_s[i]:8.2f} {dropped_s[i]:10.2f} {rec} "
+              f"{o[2] if o else s.attempts:9d}")
+
+    print()
+    missing = len(sockets) - len(recovered)
+    if missing:
+        print(f"  FAIL - {missing}/{len(sockets)} sockets not transcribing {args.timeout:.0f}s after the storm")
+        return 1
+    print(f"  PASS - full recovery {recovered_at - storm_at:.2f}s after the endpoint went down")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="reconnect-storm simulator for /ws/transcribe")
+    parser.add_argument("--desktops", type=int, default=50, help="desktops, two sockets each (mic + system)")
+    parser.add_argument("--mode", choices=("restart", "kill"), default="restart",
+                        help="restart closes with 1012; kill drops TCP with no close frame")
+    parser.add_argument("--downtime", type=float, default=5.0, help="seconds the endpoint stays down")
+    parser.add_argument("--hold", type=float, default=5.0, help="seconds of steady streaming before the storm")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which desktops first connect")
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds of streaming after recovery")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for full recovery")
+    parser.add_argument("--ready-delay", type=float, default=0.25, help="mock provider connect time")
+    parser.add_argument("--provider-slots", type=int, default=16, help="mock provider connects in flight (0 = unbounded)")
+    parser.add_argument("--jitter", choices=("none", "full"), default="none")
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    args.provider_slots = args.provider_slots or None
+    try:
+        return asyncio.run(run_storm(args))
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
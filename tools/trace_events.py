@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""One timeline for a whole call: Python tool stages and the app's own records.
+
+    python3 tools/ws_archive.py record calls.wsa        # during the call
+    python3 tools/ws_archive.py chunks calls.wsa -o /tmp/chunk-meta.jsonl
+    python3 tools/aec-hardware-gate.py --trace /tmp/gate.json
+    python3 tools/trace_events.py -o /tmp/call.json \\
+        --diagnostics ~/Library/Logs/Taylos/audio-diagnostics.log \\
+        --chunks /tmp/chunk-meta.jsonl --tool /tmp/gate.json
+
+Open the result in https://ui.perfetto.dev or chrome://tracing.
+
+Until this existed the only profiling was `print`, which says what happened
+but not where the time went, and cannot put a gate stage next to the capture
+stream it was measuring. Everything here is written as Chrome trace-event JSON
+on ONE clock - Unix epoch microseconds - because that is the only clock all
+three sources share:
+
+  * tool spans (`Tracer`) are stamped from `time.time_ns()` at entry;
+  * `audio-diagnostics` lines carry an ISO `at`;
+  * `AudioChunkMetadata` from `src/main/capture-timeline.ts` is relative to
+    `session_epoch_ms`, so `session_epoch_ms + capture_start_ms` is absolute.
+
+`--chunks` takes JSONL of either bare metadata or the `audio_chunk_meta`
+control envelopes the renderer sends; other lines are ignored. The app does
+not log its chunk metadata anywhere, so the way to get it is to record the
+call through the `ws_archive.py` proxy, which keeps every envelope the
+desktop sent on both sockets, and extract them with `ws_archive.py chunks`.
+Mic and system land on separate tracks, with an instant marker wherever a
+source's next chunk does not start where the previous one ended - the gaps are
+usually the point.
+
+The diagnostics log is appended to while the app runs, so a conversion taken
+mid-call can end on a half-written line; that line is skipped, the same way
+`ws_archive.py` stops at a torn record. A bad line anywhere else is an error.
+
+Standard library only, so any tool can import it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+# Fixed ids for the desktop's own tracks. No process can have PID 0 - a tool
+# running as a container's entrypoint is PID 1 - so a merged file never folds
+# a tool onto the app.
+DESKTOP_PID = 0
+DIAGNOSTICS_TID = 1
+CHUNK_TID = {"mic": 2, "system": 3}
+
+# Diagnostics that report how long something took rather than that it
+# happened. Drawn as a span ending at `at` so startup and stalls have width.
+DURATION_FIELDS = {
+    "system_audio_ready": "readyInMs",
+    "system_audio_stall": "ageMs",
+}
+
+# A chunk starting this much later than the previous one ended is a gap worth
+# marking. Sub-millisecond differences are float rounding in the metadata.
+GAP_MS = 1.0
+
+
+def _now_us() -> float:
+    return time.time_ns() / 1000
+
+
+def _meta(pid: int, tid: int | None, kind: str, name: str) -> dict:
+    event = {"ph": "M", "pid": pid, "name": kind, "args": {"name": name}}
+    if tid is not None:
+        event["tid"] = tid
+    return event
+
+
+class Tracer:
+    """Collects complete ("X") and instant ("i") spans for one tool run.
+
+    Cheap enough to leave on unconditionally; nothing is written until
+    `write()`, so a tool only needs a `--trace` flag to decide whether to keep
+    what was collected.
+    """
+
+    def __init__(self, process_name: str) -> None:
+        self.pid = os.getpid()
+        self.events: list[dict] = [_meta(self.pid, None, "process_name", process_name)]
+        self._lock = threading.Lock()
+        self._threads: set[int] = set()
+
+    def _tid(self) -> int:
+        tid = threading.get_ident() & 0x7FFFFFFF
+        if tid not in self._threads:
+            self._threads.add(tid)
+            self.events.append(_meta(self.pid, tid, "thread_name", threading.current_thread().name))
+        return tid
+
+    @contextmanager
+    def span(self, name: str, **args: object) -> Iterator[None]:
+        start = _now_us()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Duration from the monotonic counter: wall-clock steps during a
+            # 15 s playrec would otherwise show up as negative or inflated spans.
+            dur = (time.perf_counter() - t0) * 1e6
+            with self._lock:
+                self.events.append({"ph": "X", "name": name, "pid": self.pid, "tid": self._tid(),
+                                    "ts": start, "dur": dur, "args": args})
+
+    def instant(self, name: str, **args: object) -> None:
+        with self._lock:
+            self.events.append({"ph": "i", "s": "t", "name": name, "pid": self.pid,
+                                "tid": self._tid(), "ts": _now_us(), "args": args})
+
+    def write(self, path: Path) -> None:
+        write_trace(path, self.events)
+
+
+def write_trace(path: Path, events: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}) + "\n")
+
+
+def _iso_us(value: str) -> float:
+    # `new Date().toISOString()` ends in Z, which fromisoformat only accepts
+    # from Python 3.11.
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1e6
+
+
+def read_jsonl(path: Path) -> Iterator[dict]:
+    """Records of a JSONL file that may still be being appended to.
+
+    An unparseable LAST line is a write in progress and is skipped; one
+    anywhere else is corruption and raises.
+    """
+    # A torn write can also end mid-character, so decoding must not raise.
+    lines = [line for line in path.read_text(errors="replace").splitlines() if line.strip()]
+    for number, line in enumerate(lines, 1):
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as err:
+            if number == len(lines):
+                return
+            raise ValueError(f"{path}: record {number} is not JSON: {err}") from err
+
+
+def diagnostics_events(path: Path) -> list[dict]:
+    """`appendAudioDiagnostic` JSONL onto the desktop's diagnostics track."""
+    events = [_meta(DESKTOP_PID, DIAGNOSTICS_TID, "thread_name", "audio-diagnostics")]
+    for record in read_jsonl(path):
+        at = _iso_us(record.pop("at"))
+        event = record.pop("event")
+        name = f"{event}:{record['status']}" if "status" in record else event
+        field = DURATION_FIELDS.get(event)
+        if field and isinstance(record.get(field), (int, float)):
+            dur = float(record[field]) * 1000
+            events.append({"ph": "X", "name": name, "pid": DESKTOP_PID, "tid": DIAGNOSTICS_TID,
+                           "ts": at - dur, "dur": dur, "args": record})
+        else:
+            events.append({"ph": "i", "s": "t", "name": name, "pid": DESKTOP_PID,
+                           "tid": DIAGNOSTICS_TID, "ts": at, "args": record})
+    return events
+
+
+def chunk_events(path: Path) -> list[dict]:
+    """`AudioChunkMetadata` per `chunk_seq` onto one track per capture source."""
+    events = [_meta(DESKTOP_PID, tid, "thread_name", f"{source} capture")
+              for source, tid in CHUNK_TID.items()]
+    last_end: dict[tuple[str, int, str], float] = {}
+    for meta in read_jsonl(path):
+        if meta.get("command", "audio_chunk_meta") != "audio_chunk_meta":
+            continue
+        if meta.get("schema_version") != 1 or meta.get("source") not in CHUNK_TID:
+            continue
+        source = meta["source"]
+        tid = CHUNK_TID[source]
+        epoch = float(meta["session_epoch_ms"])
+        start_ms = float(meta["capture_start_ms"])
+        end_ms = float(meta["capture_end_ms"])
+        # Sequences restart with each capture generation, so a gap is only a
+        # gap within the same session, generation and source.
+        key = (meta["capture_session_id"], meta["capture_generation"], source)
+        previous = last_end.get(key)
+        if previous is not None and start_ms - previous > GAP_MS:
+            events.append({"ph": "i", "s": "t", "name": f"{source} gap", "pid": DESKTOP_PID,
+                           "tid": tid, "ts": (epoch + previous) * 1000,
+                           "args": {"gap_ms": round(start_ms - previous, 3),
+                                    "before_seq": meta["chunk_seq"]}})
+        last_end[key] = end_ms
+        events.append({
+            "ph": "X", "name": f"{source} #{meta['chunk_seq']}", "pid": DESKTOP_PID, "tid": tid,
+            "ts": (epoch + start_ms) * 1000, "dur": (end_ms - start_ms) * 1000,
+            "args": {"chunk_seq": meta["chunk_seq"],
+                     "capture_generation": meta["capture_generation"],
+                     "sample_count": meta["sample_count"],
+                     "sample_rate": meta["sample_rate"]},
+        })
+    return events
+
+
+def tool_events(path: Path) -> list[dict]:
+    """A trace written by `Tracer.write`, already on the shared clock."""
+    return json.loads(path.read_text())["traceEvents"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="merge tool traces and app records into one Perfetto timeline")
+    parser.add_argument("-o", "--output", type=Path, required=True)
+    parser.add_argument("--diagnostics", type=Path, action="append", default=[],
+                        help="audio-diagnostics JSONL (repeatable)")
+    parser.add_argument("--chunks", type=Path, action="append", default=[],
+                        help="AudioChunkMetadata / audio_chunk_meta JSONL, e.g. from "
+                             "`ws_archive.py chunks` (repeatable)")
+    parser.add_argument("--tool", type=Path, action="append", default=[],
+                        help="trace written by a Python tool's --trace (repeatable)")
+    args = parser.parse_args()
+    if not (args.diagnostics or args.chunks or args.tool):
+        parser.error("nothing to convert")
+
+    events = [_meta(DESKTOP_PID, None, "process_name", "Taylos desktop")]
+    try:
+        for path in args.diagnostics:
+            events.extend(diagnostics_events(path))
+        for path in args.chunks:
+            events.extend(chunk_events(path))
+        for path in args.tool:
+            events.extend(tool_events(path))
+    except ValueError as err:
+        sys.exit(str(err))
+
+    write_trace(args.output, events)
+    timed = [e for e in events if "ts" in e]
+    if timed:
+        span_s = (max(e["ts"] + e.get("dur", 0) for e in timed) - min(e["ts"] for e in timed)) / 1e6
+        print(f"wrote {len(timed)} events spanning {span_s:.1f}s to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+/**
+ * Feed a generated call through the SHIPPED transcript path and time it.
+ *
+ *     node tools/transcript-scaling.cjs call.jsonl [--max-seconds=900]
+ *     python3 tools/transcript-scaling.py --write /dev/stdout | node tools/transcript-scaling.cjs -
+ *
+ * Driven by `transcript-scaling.py`, which generates the traffic and plots what
+ * this prints. Separate from the Python side for the same reason the hardware
+ * gate is: everything timed here is the real `dist/main` module, called the way
+ * ListenView calls it on every transcript event -
+ *
+ *     adapter -> applyRealtimeTranscriptEvent          (every event)
+ *     projectRealtimeTranscriptState -> rows -> dropBledMicRows
+ *     groupIntoBlocks = inSpokenOrder(projectTranscriptTimeline(rows))
+ *
+ * Rendering cost is sampled at log-spaced call lengths rather than paid on
+ * every event: at 10^6 events a quadratic render would take days, and the
+ * checkpoints are all the plot needs. The reducer does run on every event,
+ * because the state it builds IS the call length.
+ *
+ * Every event that is not accepted is counted, by reason - adapter rejections
+ * as `adapter:<reason>`, reducer ones by their transition reason. The traffic
+ * is contract-valid by construction, so any count at all, `stale-seq`
+ * included, is a generator bug.
+ *
+ * Prints one JSON line per checkpoint and a final summary line.
+ */
+const fs = require('node:fs');
+const path = require('node:path');
+const readline = require('node:readline');
+const { performance } = require('node:perf_hooks');
+
+const dist = path.join(__dirname, '..', 'dist/main');
+const { adaptServerTranscriptEvent } = require(path.join(dist, 'realtime-transcript-adapter.js'));
+const {
+  createRealtimeTranscriptState,
+  applyRealtimeTranscriptEvent,
+  projectRealtimeTranscriptState,
+} = require(path.join(dist, 'realtime-transcript-state.js'));
+const {
+  projectTranscriptTimeline,
+  inSpokenOrder,
+  groupIntoBlocks,
+  dropBledMicRows,
+  farEndTextOf,
+} = require(path.join(dist, 'transcript-order.js'));
+
+const args = process.argv.slice(2);
+const argOf = (name, dflt) => {
+  const hit = args.find((a) => a.startsWith(`--${name}=`));
+  return hit ? hit.slice(name.length + 3) : dflt;
+};
+const STREAM = args.find((a) => !a.startsWith('--'));
+const MAX_SECONDS = Number(argOf('max-seconds', '900'));
+const FIRST_CHECKPOINT = 1_000;
+const PER_DECADE = 8;
+const REPEATS = 3;
+
+if (!STREAM) {
+  console.error('usage: node tools/transcript-scaling.cjs <call.jsonl | -> [--max-seconds=N]');
+  process.exit(2);
+}
+
+/** Median wall time of `fn` in microseconds, and its last result. */
+function timed(fn) {
+  const samples = [];
+  let result;
+  for (let i = 0; i < REPEATS; i += 1) {
+    const t0 = performance.now();
+    result = fn();
+    samples.push((performance.now() - t0) * 1000);
+  }
+  samples.sort((a, b) => a - b);
+  return { us: samples[Math.floor(samples.length / 2)], result };
+}
+
+/** The row mapping ListenView applies to the canonical projection. */
+function visibleRowsOf(projection) {
+  const rows = projection.visibleRows.map((row) => ({
+    speaker: row.source === 'mic' ? 1 : 0,
+    text: row.text,
+    isFinal: row.isFinal,
+    isPartial: !row.isFinal,
+    timestamp: row.captureStartMs,
+    updatedAt: row.captureEndMs,
+    audioStartMs: row.captureStartMs,
+    audioEndMs: row.captureEndMs,
+    utteranceId: row.key,
+  }));
+  return dropBledMicRows(rows, farEndTextOf(rows));
+}
+
+(async () => {
+  const source = STREAM === '-' ? process.stdin : fs.createReadStream(STREAM);
+  const input = readline.createInterface({ input: source, crlfDelay: Infinity });
+  let meta = null;
+  let state = createRealtimeTranscriptState();
+  let events = 0;
+  let rejected = 0;
+  const reasons = {};
+  const reject = (reason) => {
+    rejected += 1;
+    reasons[reason] = (reasons[reason] || 0) + 1;
+  };
+  let reduceUs = 0;
+  let reduceCount = 0;
+  let checkpoint = FIRST_CHECKPOINT;
+  let truncated = false;
+  const started = performance.now();
+
+  for await (const line of input) {
+    if (!line) continue;
+    const message = JSON.parse(line);
+    if (meta === null) {
+      meta = message;
+      continue;
+    }
+
+    const t0 = performance.now();
+    const adapted = adaptServerTranscriptEvent(message, meta.chatId);
+    if (adapted.event) {
+      const transition = applyRealtimeTranscriptEvent(state, adapted.event);
+      state = transition.state;
+      if (!transition.accepted) reject(transition.reason);
+    } else {
+      reject(`adapter:${adapted.reason}`);
+    }
+    reduceUs += (performance.now() - t0) * 1000;
+    reduceCount += 1;
+    events += 1;
+
+    if (events < checkpoint) continue;
+
+    const project = timed(() => visibleRowsOf(projectRealtimeTranscriptState(state)));
+    const rows = project.result;
+    const timeline = timed(() => projectTranscriptTimeline(rows));
+    const order = timed(() => inSpokenOrder(timeline.result));
+    const blocks = timed(() => groupIntoBlocks(rows));
+    const perEventReduceUs = reduceUs / Math.max(1, reduceCount);
+    console.log(JSON.stringify({
+      events,
+      rows: state.rows.length,
+      reduceUs: Number(perEventReduceUs.toFixed(2)),
+      projectUs: Number(project.us.toFixed(2)),
+      timelineUs: Number(timeline.us.toFixed(2)),
+      orderUs: Number(order.us.toFixed(2)),
+      blocksUs: Number(blocks.us.toFixed(2)),
+      // What one event really costs the overlay: reduce, project, render.
+      totalUs: Number((perEventReduceUs + project.us + blocks.us).toFixed(2)),
+    }));
+    reduceUs = 0;
+    reduceCount = 0;
+    while (checkpoint <= events) {
+      checkpoint = Math.ceil(checkpoint * 10 ** (1 / PER_DECADE));
+    }
+
+    if ((performance.now() - started) / 1000 > MAX_SECONDS) {
+      truncated = true;
+      input.close();
+      // Also stop the producer: a closed pipe is how the generator learns
+      // the driver is done.
+      source.destroy();
+      break;
+    }
+  }
+
+  console.log(JSON.stringify({
+    summary: true,
+    events,
+    rejected,
+    reasons,
+    truncated,
+    seconds: Number(((performance.now() - started) / 1000).toFixed(1)),
+  }));
+})();
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""How does transcript ordering scale with the length of the call?
+
+    python3 tools/transcript-scaling.py                      # 10^3 .. 10^6 events
+    python3 tools/transcript-scaling.py --events 100000      # shorter sweep
+    python3 tools/transcript-scaling.py --write calls.jsonl  # traffic only, no bench
+
+The reducer, the projection and `groupIntoBlocks` all run on EVERY transcript
+event for the whole call, and the only material they have ever seen is the
+five-message contract fixture. A cost that is flat at five rows and quadratic
+at fifty thousand would pass every test we have and still freeze the overlay
+an hour into a call. This finds out.
+
+The traffic is generated, not recorded, but it is shaped exactly like
+`tests/fixtures/backend-transcript-contract.json` - the same envelope, the same
+identity fields, timed words on the capture clock - so the desktop adapter
+accepts all of it. What makes it realistic rather than merely valid:
+
+  * two sources taking turns, with short backchannels ("ja", "okay") from the
+    listener landing inside the other side's turn;
+  * every utterance grows through interim partials before its final, and now
+    and then a partial revises its last word instead of only appending;
+  * each source flushes on its own schedule, and the system side occasionally
+    stalls and flushes seconds late, so arrival order disagrees with spoken
+    order - but never by more than `REORDER_WINDOW_MS`, the bound the ordering
+    code is built around. `generate()` asserts it on every event.
+
+The stream is piped to `tools/transcript-scaling.cjs` as it is generated (a
+million events is about 1.9 GB of JSON, so it never touches disk unless
+`--write` asks for it), which feeds it through
+the built `dist/main` modules the way ListenView does and reports per-event
+cost at log-spaced call lengths. The result is plotted here with a fitted
+exponent: flat per-event cost is linear in the call, anything with a positive
+slope is the super-linear behaviour this exists to catch.
+
+Requires: node and a built `dist/main`. Standard library only on this side.
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import math
+import random
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import IO, Iterator
+
+ROOT = Path(__file__).resolve().parents[1]
+DRIVER = Path(__file__).resolve().parent / "transcript-scaling.cjs"
+
+# Mirrors src/main/transcript-order.ts. Lateness beyond this would be frozen as
+# history by `inSpokenOrder`, which is a different code path from the one being
+# measured, so the generator keeps every event inside it.
+REORDER_WINDOW_MS = 20_000
+# How far after its own start an event may arrive. An event can only be late
+# against starts spoken before it arrived, so this bounds its lateness against
+# the newest row too; the remainder of the window is margin.
+MAX_ARRIVAL_AFTER_START_MS = REORDER_WINDOW_MS * 0.75
+# Longest utterance the generator speaks, so that even its final - which cannot
+# arrive before its last word - fits inside the budget above.
+MAX_UTTERANCE_MS = 10_000
+
+CHAT_ID = "4711"
+SESSION_EPOCH_MS = 1_756_000_000_000.0
+SPEAKER = {"system": 0, "mic": 1}
+
+WORDS = (
+    "also wir haben aktuell ungefähr vierzig leute im vertrieb und das größte "
+    "problem ist die einarbeitung ein neuer kollege braucht fünf monate bis er "
+    "seine quote erreicht right that makes sense let me ask you something about "
+    "that when you say ramp time are you measuring from the first day or from "
+    "the end of onboarding because most teams we work with measure it "
+    "differently pricing budget quarter renewal contract pilot timeline team"
+).split()
+BACKCHANNELS = (["ja"], ["okay"], ["genau"], ["mhm"], ["right"], ["ja", "genau"])
+
+# Above this slope of log(per-event cost) against log(call length) the cost is
+# no longer flat. 0.2 leaves room for cache effects and GC noise; a per-event
+# cost that grows with the row count sits near 1.0.
+MAX_FLAT_SLOPE = 0.2
+
+
+def _utterance_words(rng: random.Random, start_ms: float, tokens: list[str]) -> list[dict]:
+    words = []
+    t = start_ms
+    for token in tokens:
+        if words and t - start_ms > MAX_UTTERANCE_MS:
+            break
+        # Short function words come back zero-width from the provider. The
+        # fixture carries them on purpose and so does this.
+        width = 0.0 if len(token) <= 2 and rng.random() < 0.5 else rng.uniform(150, 450)
+        words.append({"text": token, "start_ms": t, "end_ms": t + width})
+        t += width + rng.uniform(40, 160)
+    return words
+
+
+def _turns(rng: random.Random) -> Iterator[tuple[str, list[dict]]]:
+    """(source, timed words), in spoken order of utterance start."""
+    t = 1_000.0
+    source = "system"
+    while True:
+        # Word count is capped here; duration is capped by `_utterance_words`.
+        length = min(40, max(1, int(rng.lognormvariate(2.3, 0.6))))
+        tokens = [rng.choice(WORDS) for _ in range(length)]
+        words = _utterance_words(rng, t, tokens)
+        length = len(words)
+        end = words[-1]["end_ms"]
+        yield source, words
+        # The listener's "ja" lands mid-turn, which is exactly what makes
+        # arrival order and spoken order disagree across the two streams.
+        if length > 6 and rng.random() < 0.35:
+            other = "mic" if source == "system" else "system"
+            at = rng.uniform(words[0]["start_ms"], end)
+            yield other, _utterance_words(rng, at, list(rng.choice(BACKCHANNELS)))
+        t = end + rng.uniform(250, 1_500)
+        if rng.random() < 0.8:
+            source = "mic" if source == "system" else "system"
+
+
+def _snapshots(rng: random.Random, words: list[dict]) -> list[tuple[list[dict], bool]]:
+    """Interim partials roughly every second of speech, then the final."""
+    out: list[tuple[list[dict], bool]] = []
+    cut = 0
+    while True:
+        cut += rng.randint(2, 4)
+        if cut >= len(words):
+            break
+        partial = [dict(w) for w in words[:cut]]
+        if rng.random() < 0.15:
+            # A divergent interim: the provider changed its mind about the last
+            # word. The reducer must accept it even though it is not a prefix.
+            partial[-1]["text"] = rng.choice(WORDS)
+        out.append((partial, False))
+    out.append((words, True))
+    return out
+
+
+def _flush_latency_ms(rng: random.Random, source: str, is_final: bool) -> float:
+    base = rng.uniform(700, 1_500) if is_final else rng.uniform(150, 450)
+    # The system stream is force-flushed by provider endpointing and now and
+    # then holds a whole turn back; `generate` clamps the total to
+    # MAX_ARRIVAL_AFTER_START_MS.
+    if source == "system" and rng.random() < 0.03:
+        base += rng.uniform(2_000, REORDER_WINDOW_MS * 0.6)
+    return base
+
+
+def generate(events: int, seed: int = 1) -> Iterator[dict]:
+    """A contract-valid `transcript_segment` stream of `events` messages, in arrival order."""
+    rng = random.Random(seed)
+    session_id = f"capture-synthetic-{seed:04d}"
+    pending: list[tuple[float, int, dict]] = []
+    produced = 0
+    tie = 0
+    counters = {"system": 0, "mic": 0}
+    seq = {"system": 0, "mic": 0}
+    activity = 0
+    newest_start = float("-inf")
+
+    for source, words in _turns(rng):
+        counters[source] += 1
+        utterance_id = f"u-{'sys' if source == 'system' else 'mic'}-{counters[source]}"
+        last_arrival = 0.0
+        for snap, is_final in _snapshots(rng, words):
+            start = snap[0]["start_ms"]
+            end = max(w["end_ms"] for w in snap)
+            # Arrival never goes backwards within one utterance: a transport
+            # delivers one provider stream in order, and seq depends on it. A
+            # stall is cut off at the lateness budget; `end` is always inside
+            # it because utterances are shorter than the budget.
+            latency = _flush_latency_ms(rng, source, is_final)
+            arrival = max(last_arrival, min(end + latency, start + MAX_ARRIVAL_AFTER_START_MS))
+            last_arrival = arrival
+            message = {
+                "type": "transcript_segment",
+                "data": {
+                    "text": " ".join(w["text"] for w in snap),
+                    "speaker": SPEAKER[source],
+                    "is_final": is_final,
+                    "is_turn_complete": is_final,
+                    "source": source,
+                    "capture_session_id": session_id,
+                    "capture_generation": 0,
+                    "capture_start_ms": round(start, 1),
+                    "capture_end_ms": round(end, 1),
+                    "session_epoch_ms": SESSION_EPOCH_MS,
+                    "stream_generation": 0,
+                    "audio_start_ms": SESSION_EPOCH_MS + round(start, 1),
+                    "audio_end_ms": SESSION_EPOCH_MS + round(end, 1),
+                    "clock_domain_valid": True,
+                    "words": [
+                        {
+                            "text": w["text"],
+                            "start_ms": SESSION_EPOCH_MS + round(w["start_ms"], 1),
+                            "end_ms": SESSION_EPOCH_MS + round(w["end_ms"], 1),
+                            "capture_start_ms": round(w["start_ms"], 1),
+                            "capture_end_ms": round(w["end_ms"], 1),
+                        }
+                        for w in snap
+                    ],
+                    "utterance_id": utterance_id,
+                    "event_id": f"{session_id}:0:{source}:0:{utterance_id}",
+                },
+                "_source": source,
+            }
+            tie += 1
+            heapq.heappush(pending, (arrival, tie, message))
+
+        # Everything that arrives before the earliest thing still unspoken can
+        # be released. REORDER_WINDOW_MS bounds how far back that can reach.
+        horizon = words[0]["start_ms"]
+        while pending and pending[0][0] < horizon:
+            arrival, _, message = heapq.heappop(pending)
+            data = message["data"]
+            newest_start = max(newest_start, data["capture_start_ms"])
+            lateness = newest_start - data["capture_start_ms"]
+            assert lateness < REORDER_WINDOW_MS, (
+                f"{data['event_id']} arrives {lateness:.0f} ms behind the newest row, "
+                f"outside the {REORDER_WINDOW_MS} ms reorder window")
+            # Stamped at release so both are monotonic in arrival order, as the
+            # server would stamp them.
+            seq[data["source"]] += 1
+            activity += 1
+            data["seq"] = seq[data["source"]]
+            data["timestamp"] = round((SESSION_EPOCH_MS + arrival) / 1000, 3)
+            data["trace"] = {
+                "provider_received_at_ms": int(SESSION_EPOCH_MS + arrival),
+                "server_sent_at_ms": int(SESSION_EPOCH_MS + arrival + 40),
+                "activity_sequence": activity,
+                "audio_clock_anchored": True,
+            }
+            yield message
+            produced += 1
+            if produced >= events:
+                return
+
+
+def write_stream(f: IO[str], events: int, seed: int) -> None:
+    meta = {"chatId": CHAT_ID, "events": events, "seed": seed,
+            "note": "generated by tools/transcript-scaling.py"}
+    f.write(json.dumps(meta) + "\n")
+    for message in generate(events, seed):
+        f.write(json.dumps(message, separators=(",", ":")) + "\n")
+
+
+def run_driver(events: int, seed: int, max_seconds: float) -> subprocess.CompletedProcess:
+    """Run the Node driver with the stream generated straight into its stdin."""
+    node = subprocess.Popen(
+        ["node", str(DRIVER), "-", f"--max-seconds={max_seconds}"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, cwd=str(ROOT),
+    )
+    # Drain both output pipes on their own threads while this one writes, so
+    # neither side can block on a full pipe.
+    output: dict[str, str] = {}
+
+    def drain(name: str, pipe: IO[str]) -> None:
+        output[name] = pipe.read()
+
+    readers = [threading.Thread(target=drain, args=("stdout", node.stdout)),
+               threading.Thread(target=drain, args=("stderr", node.stderr))]
+    for reader in readers:
+        reader.start()
+    try:
+        try:
+            write_stream(node.stdin, events, seed)
+        finally:
+            node.stdin.close()
+    except BrokenPipeError:
+        pass  # the driver hit --max-seconds, or failed; its exit code says which
+    except BaseException:
+        node.kill()
+        raise
+    finally:
+        for reader in readers:
+            reader.join()
+        node.wait()
+    return subprocess.CompletedProcess(node.args, node.returncode, output["stdout"], output["stderr"])
+
+
+def slope(points: list[dict]) -> float:
+    """Least-squares slope of log(per-event cost) on log(call length), upper half."""
+    upper = points[len(points) // 2:]
+    if len(upper) < 2:
+        return 0.0
+    xs = [math.log(p["events"]) for p in upper]
+    ys = [math.log(max(p["totalUs"], 1e-3)) for p in upper]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    den = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / den if den else 0.0
+
+
+def plot(points: list[dict], width: int = 60, height: int = 16) -> None:
+    """Log-log ASCII plot of per-event cost against call length."""
+    xs = [math.log10(p["events"]) for p in points]
+    ys = [math.log10(max(p["totalUs"], 1e-3)) for p in points]
+    x0, x1 = min(xs), max(xs)
+    y0, y1 = min(ys), max(ys)
+    if y1 - y0 < 1:
+        y0, y1 = y0 - 0.5, y0 + 0.5
+    grid = [[" "] * width for _ in range(height)]
+    for x, y in zip(xs, ys):
+        col = int((x - x0) / max(x1 - x0, 1e-9) * (width - 1))
+        row = height - 1 - int((y - y0) / (y1 - y0) * (height - 1))
+        grid[row][col] = "*"
+    print("  us/event (log)")
+    for i, line in enumerate(grid):
+        label = 10 ** (y1 - i * (y1 - y0) / (height - 1))
+        print(f"  {label:9.1f} |{''.join(line)}")
+    print(f"  {'':9} +{'-' * width}")
+    print(f"  {'':9}  {10 ** x0:<12.0f}{'events in call (log)':^{width - 24}}{10 ** x1:>12.0f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="transcript ordering scaling bench")
+    parser.add_argument("--events", type=int, default=1_000_000,
+                        help="length of the generated call, in transcript events")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--write", type=Path,
+                        help="only write the generated stream to this JSONL file")
+    parser.add_argument("--max-seconds", type=float, default=900,
+                        help="stop the Node driver after this long; the plot covers what it reached")
+    args = parser.parse_args()
+
+    if args.write:
+        with args.write.open("w") as f:
+            write_stream(f, args.events, args.seed)
+        print(f"wrote {args.events} events to {args.write}")
+        return 0
+
+    print("=" * 68)
+    print(f"  TRANSCRIPT ORDERING SCALING - up to {args.events} events, seed {args.seed}")
+    print("=" * 68)
+    node = run_driver(args.events, args.seed, args.max_seconds)
+    if node.returncode != 0:
+        print(node.stdout + node.stderr)
+        sys.exit("driver failed")
+
+    lines = [json.loads(line) for line in node.stdout.splitlines() if line.startswith("{")]
+    points = [p for p in lines if "summary" not in p]
+    summary = next((p for p in lines if "summary" in p), {})
+    if len(points) < 2:
+        sys.exit("driver produced fewer than two checkpoints")
+
+    print(f"\n  {'events':>9} {'rows':>7} {'reduce':>9} {'project':>9} {'timeline':>9} "
+          f"{'order':>9} {'blocks':>9} {'total':>9}   us/event")
+    for p in points:
+        print(f"  {p['events']:>9} {p['rows']:>7} {p['reduceUs']:>9.1f} {p['projectUs']:>9.1f} "
+              f"{p['timelineUs']:>9.1f} {p['orderUs']:>9.1f} {p['blocksUs']:>9.1f} "
+              f"{p['totalUs']:>9.1f}")
+    print()
+    plot(points)
+
+    k = slope(points)
+    print("\n" + "-" * 68)
+    if summary.get("rejected"):
+        print(f"  REJECTED           {summary['rejected']} events - the generator is off contract")
+        for reason, count in sorted(summary.get("reasons", {}).items()):
+            print(f"    {reason:<36} {count}")
+    if summary.get("truncated"):
+        print(f"  TRUNCATED          at {points[-1]['events']} events after {args.max_seconds:.0f}s")
+    print(f"  SCALING EXPONENT   {k:+.2f}   per-event cost ~ events^k (0 = linear call cost)")
+    print("-" * 68)
+    if summary.get("rejected"):
+        return 1
+    if k > MAX_FLAT_SLOPE:
+        print(f"\n  SUPER-LINEAR - per-event cost grows with call length (k={k:.2f})")
+        return 1
+    print("\n  FLAT - per-event cost does not grow with call length")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+"""Record real /ws/transcribe sessions and play them back later.
+
+    # record: point the desktop at the proxy, e.g. VITE_BACKEND_WS_URL=ws://127.0.0.1:8766
+    python3 tools/ws_archive.py record calls.wsa --upstream ws://localhost:8000
+
+    python3 tools/ws_archive.py ls calls.wsa
+    python3 tools/ws_archive.py chunks calls.wsa -o chunk-meta.jsonl   # for trace_events.py
+    python3 tools/ws_archive.py replay calls.wsa --target ws://127.0.0.1:8765 --speed 4
+    python3 tools/ws_archive.py replay calls.wsa --session 3 --session 4 \\
+        --target ws://localhost:8000 --token "$JWT"
+
+A performance regression in the transcript path was only ever reproducible by
+making another call and hoping it behaved the same. `test-desktop-ascended.py`
+can open a socket, but nothing captured what a real desktop session sent - PCM
+frames interleaved with the `audio_chunk_meta` envelopes from
+`serializeAudioChunkMetaControlEnvelope` - or what came back. This does, and
+can re-drive any of it.
+
+Archive format
+--------------
+One append-only file of length-prefixed records, so a recorder that dies
+mid-call leaves every earlier record readable, and mic and system sockets from
+the same call share one file. Reopening an archive cuts a torn last record off
+before appending, so the next recording starts on a record boundary:
+
+    magic   b"TWSA2\\n"
+    record  <B kind> <I session> <Q offset_us> <I length> <payload>
+
+`offset_us` is time since that session's OPEN. Payloads are the frames as sent,
+except that binary ones are zlib-deflated per record when that is smaller, and
+flagged with DEFLATED (0x80) in `kind`. Per record keeps a torn tail from
+costing more than its own frame, and `read_records` inflates transparently.
+What it buys depends on the audio: 100 ms of speech deflates by only ~12%, but
+the digital silence a system source sends while nobody talks goes to ~1%, and
+a call is mostly that. TWSA1 archives (never deflated) still read, and
+appending to one keeps it TWSA1.
+OPEN carries the path and query as JSON, with `token` REDACTED: an archive is
+something people attach to tickets, and a bearer token in it would be a
+credential leak. Replay needs `--token` when the target checks it.
+
+The index is a sidecar `<archive>.idx`, one JSON line per session appended at
+OPEN and again at CLOSE (the later line wins). It holds the OPEN record's byte
+offset, so replaying one session of a long day seeks straight to it instead of
+scanning. It is derived data: `ls --reindex` rebuilds it from the archive.
+
+Replay pacing follows the recording, divided by `--speed` (0 = as fast as the
+socket accepts). The one exception is readiness: frames the desktop sent after
+it saw `dg_open` wait for the target's own `dg_open`, because the desktop
+never sends audio before the provider is ready and a replay that did would be
+measuring a client that does not exist. Like the desktop, it gives up after
+15 s, or as soon as the target closes first - a target that rejects the
+REDACTED token does exactly that - and reports the session as an error.
+
+Requires: websockets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterator
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import websockets
+
+from ws_mock import request_path
+
+MAGIC = b"TWSA2\n"
+MAGIC_V1 = b"TWSA1\n"
+HEADER = struct.Struct("<BIQI")
+
+OPEN = 0
+CLOSE = 1
+C2S_TEXT = 2
+C2S_BINARY = 3
+S2C_TEXT = 4
+S2C_BINARY = 5
+DEFLATED = 0x80
+
+REDACTED = "REDACTED"
+
+# The setTimeout(..., 15000) in connect() in websocketService.ts, which closes
+# with 'Provider ready timeout'.
+PROVIDER_READY_TIMEOUT_S = 15.0
+
+# Close codes that say how a socket went away rather than what a peer sent.
+# The protocol forbids sending them, so the proxy passes on a code it may send:
+# no status becomes a normal close, a dropped or failed socket an error.
+UNSENDABLE_CLOSE = {1005: 1000, 1006: 1011, 1015: 1011}
+
+
+@dataclass
+class Record:
+    kind: int
+    session: int
+    offset_us: int
+    payload: bytes
+
+
+class ArchiveWriter:
+    """Appends records and keeps the sidecar index current.
+
+    Writes are synchronous and happen on the event loop thread, so records
+    from concurrent sessions never interleave inside one another.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.index_path = path.with_name(path.name + ".idx")
+        size = path.stat().st_size if path.exists() else 0
+        # A file shorter than the magic is a recorder that died on its first
+        # write; it holds nothing and starts over.
+        head = path.read_bytes() if size else b""
+        fresh = size < len(MAGIC) and (MAGIC.startswith(head) or MAGIC_V1.startswith(head))
+        torn = False
+        if not fresh:
+            end = complete_length(path)
+            if end < size:
+                # A recorder killed mid-record left a partial one. Appending
+                # after it would put the next record inside its length prefix,
+                # so cut it off first.
+                with path.open("r+b") as f:
+                    f.truncate(end)
+                torn = True
+        # Records appended to a TWSA1 archive stay TWSA1, so one file never
+        # mixes formats.
+        self._deflate = fresh or _magic(path) == MAGIC
+        self._f: BinaryIO = path.open("wb" if fresh else "ab")
+        if fresh:
+            self._f.write(MAGIC)
+            self._f.flush()
+        # After a cut the index may name a session whose OPEN was the torn
+        # record, so it is rebuilt from what survived.
+        known = [] if fresh else (reindex(path) if torn else read_index(self.index_path) or reindex(path))
+        self._next_session = 1 + max((s["session"] for s in known), default=0)
+        self._opened: dict[int, dict] = {}
+
+    def open_session(self, path: str) -> tuple[int, float]:
+        session = self._next_session
+        self._next_session += 1
+        started = time.monotonic()
+        offset = self._f.tell()
+        info = {"session": session, "offset": offset, "path": redact(path),
+                "started_at": time.time(), "frames": 0, "bytes": 0, "closed": False}
+        self._write(OPEN, session, 0, json.dumps({"path": info["path"],
+                                                   "started_at": info["started_at"]}).encode())
+        self._opened[session] = info
+        self._index(info)
+        return session, started
+
+    def frame(self, session: int, started: float, kind: int, payload: bytes) -> None:
+        self._write(kind, session, int((time.monotonic() - started) * 1e6), payload)
+        info = self._opened[session]
+        info["frames"] += 1
+        info["bytes"] += len(payload)
+
+    def close_session(self, session: int, started: float, code: int | None, reason: str) -> None:
+        duration_us = int((time.monotonic() - started) * 1e6)
+        self._write(CLOSE, session, duration_us, json.dumps({"code": code, "reason": reason}).encode())
+        info = self._opened.pop(session)
+        info.update(closed=True, duration_s=duration_us / 1e6, code=code)
+        self._index(info)
+
+    def close(self) -> None:
+        self._f.close()
+
+    def _write(self, kind: int, session: int, offset_us: int, payload: bytes) -> None:
+        if self._deflate and kind in (C2S_BINARY, S2C_BINARY):
+            # Level 1: this runs on the proxy's event loop, and the higher
+            # levels gain almost nothing on PCM.
+            deflated = zlib.compress(payload, 1)
+            if len(deflated) < len(payload):
+                kind, payload = kind | DEFLATED, deflated
+        self._f.write(HEADER.pack(kind, session, offset_us, len(payload)))
+        self._f.write(payload)
+        # Flushed per record: the point of append-only is that a crash keeps
+        # everything before it, which a userspace buffer would not.
+        self._f.flush()
+
+    def _index(self, info: dict) -> None:
+        with self.index_path.open("a") as f:
+            f.write(json.dumps(info) + "\n")
+
+
+def redact(path: str) -> str:
+    parts = urlsplit(path)
+    query = [(k, REDACTED if k == "token" else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    return parts.path + ("?" + urlencode(query) if query else "")
+
+
+def sendable_close(code: int | None, reason: str) -> tuple[int, str]:
+    """A close the proxy may send for one it observed, keeping the original."""
+    if code is None:
+        return 1000, reason
+    if code not in UNSENDABLE_CLOSE:
+        return code, reason
+    return UNSENDABLE_CLOSE[code], f"peer closed with {code}" + (f": {reason}" if reason else "")
+
+
+def with_token(path: str, token: str | None) -> str:
+    if token is None:
+        return path
+    parts = urlsplit(path)
+    query = [(k, token if k == "token" else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    return parts.path + "?" + urlencode(query)
+
+
+def _magic(path: Path) -> bytes:
+    with path.open("rb") as f:
+        magic = f.read(len(MAGIC))
+    if magic not in (MAGIC, MAGIC_V1):
+        raise ValueError(f"{path}: not a transcribe archive")
+    return magic
+
+
+def _stored_records(path: Path, offset: int | None = None) -> Iterator[tuple[int, Record]]:
+    """(byte offset, record) as stored, stopping cleanly at a torn tail."""
+    _magic(path)
+    with path.open("rb") as f:
+        f.seek(len(MAGIC) if offset is None else offset)
+        while True:
+            at = f.tell()
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            kind, session, offset_us, length = HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield at, Record(kind, session, offset_us, payload)
+
+
+def read_records(path: Path, offset: int | None = None) -> Iterator[tuple[int, Record]]:
+    """(byte offset, record) from `offset` with payloads as sent."""
+    for at, record in _stored_records(path, offset):
+        if record.kind & DEFLATED:
+            record = Record(record.kind & ~DEFLATED, record.session, record.offset_us,
+                            zlib.decompress(record.payload))
+        yield at, record
+
+
+def complete_length(path: Path) -> int:
+    """Byte length of the archive up to the end of its last complete record."""
+    end = len(MAGIC)
+    for at, record in _stored_records(path):
+        end = at + HEADER.size + len(record.payload)
+    return end
+
+
+def read_index(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    latest: dict[int, dict] = {}
+    for line in path.read_text().splitlines():
+        if line.strip():
+            info = json.loads(line)
+            latest[info["session"]] = info
+    return [latest[k] for k in sorted(latest)]
+
+
+def reindex(archive: Path) -> list[dict]:
+    sessions: dict[int, dict] = {}
+    for at, record in read_records(archive):
+        if record.kind == OPEN:
+            meta = json.loads(record.payload)
+            sessions[record.session] = {"session": record.session, "offset": at, "path": meta["path"],
+                                        "started_at": meta["started_at"], "frames": 0, "bytes": 0,
+                                        "closed": False}
+        elif record.kind == CLOSE:
+            sessions[record.session].update(closed=True, duration_s=record.offset_us / 1e6,
+                                            code=json.loads(record.payload)["code"])
+        else:
+            sessions[record.session]["frames"] += 1
+            sessions[record.session]["bytes"] += len(record.payload)
+    index_path = archive.with_name(archive.name + ".idx")
+    index_path.write_text("".join(json.dumps(s) + "\n" for s in sessions.values()))
+    return list(sessions.values())
+
+
+def session_records(archive: Path, info: dict) -> list[Record]:
+    out = []
+    for _, record in read_records(archive, info["offset"]):
+        if record.session != info["session"]:
+            continue
+        out.append(record)
+        if record.kind == CLOSE:
+            break
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Recording proxy
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def _record(args: argparse.Namespace) -> None:
+    writer = ArchiveWriter(args.archive)
+    upstream_base = args.upstream.rstrip("/")
+
+    async def handle(client) -> None:
+        path = request_path(client)
+        session, started = writer.open_session(path)
+        print(f"  session {session} open   {redact(path)}")
+        code, reason = None, ""
+        try:
+            async with websockets.connect(upstream_base + path, max_size=None) as upstream:
+                async def pump(src, dst, text_kind: int, binary_kind: int) -> None:
+                    try:
+                        async for frame in src:
+                            if isinstance(frame, str):
+                                writer.frame(session, started, text_kind, frame.encode())
+                            else:
+                                writer.frame(session, started, binary_kind, bytes(frame))
+                            await dst.send(frame)
+                    except websockets.ConnectionClosed:
+                        # Either side dropping ends the pump; the close code is
+                        # read off the socket below.
+                        pass
+
+                up = asyncio.create_task(pump(client, upstream, C2S_TEXT, C2S_BINARY))
+                down = asyncio.create_task(pump(upstream, client, S2C_TEXT, S2C_BINARY))
+                done, pending = await asyncio.wait({up, down}, return_when=asyncio.FIRST_COMPLETED)
+                for task in pending:
+                    task.cancel()
+                # Whichever side hung up first owns the close code; pass it on.
+                first = up if up in done else down
+                closed_side, other = (client, upstream) if first is up else (upstream, client)
+                code, reason = closed_side.close_code, closed_side.close_reason or ""
+                await other.close(*sendable_close(code, reason))
+        except (OSError, websockets.InvalidHandshake) as err:
+            code, reason = 1011, f"upstream unavailable: {err}"
+            await client.close(1011, "upstream unavailable")
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            writer.close_session(session, started, code, reason)
+            print(f"  session {session} closed code={code}")
+
+    async with websockets.serve(handle, args.host, args.port, max_size=None) as server:
+        # Port 0 binds any free port; report the one the desktop should use.
+        port = next(iter(server.sockets)).getsockname()[1]
+        print(f"recording ws://{args.host}:{port} -> {upstream_base} into {args.archive}")
+        await asyncio.Future()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Replay
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class ReplayResult:
+    session: int
+    ready_s: float | None = None
+    sent_frames: int = 0
+    sent_bytes: int = 0
+    received: int = 0
+    segments: int = 0
+    recorded_segments: int = 0
+    # Per segment, replay arrival minus recorded arrival, both relative to the
+    # session's first audio frame. Positive = the target is slower than the
+    # recording was.
+    segment_lag_s: list[float] = field(default_factory=list)
+    error: str | None = None
+
+
+def _is_ready(payload: bytes | str) -> bool:
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        return False
+    return message.get("type") == "status" and (message.get("data") or {}).get("dg_open") is True
+
+
+def _is_segment(payload: bytes | str) -> bool:
+    try:
+        return json.loads(payload).get("type") == "transcript_segment"
+    except ValueError:
+        return False
+
+
+async def replay_session(archive: Path, info: dict, target: str, speed: float,
+                         token: str | None, drain_s: float = 1.0) -> ReplayResult:
+    records = session_records(archive, info)
+    result = ReplayResult(session=info["session"])
+    path = with_token(json.loads(records[0].payload)["path"], token)
+
+    # Which client frames the desktop only sent once the provider was ready.
+    ready_at_us = next((r.offset_us for r in records if r.kind == S2C_TEXT and _is_ready(r.payload)), None)
+    first_audio_us = next((r.offset_us for r in records if r.kind == C2S_BINARY), 0)
+    recorded_segments = [r.offset_us - first_audio_us for r in records
+                         if r.kind == S2C_TEXT and _is_segment(r.payload)]
+    result.recorded_segments = len(recorded_segments)
+
+    ready = asyncio.Event()
+    scale = 1 / speed if speed > 0 else 0.0
+    t0 = time.monotonic()
+    first_audio_at: float | None = None
+    replay_segments: list[float] = []
+
+    try:
+        async with websockets.connect(target.rstrip("/") + path, max_size=None) as ws:
+            async def receive() -> None:
+                try:
+                    async for frame in ws:
+                        result.received += 1
+                        if isinstance(frame, str) and _is_ready(frame) and not ready.is_set():
+                            result.ready_s = time.monotonic() - t0
+                            ready.set()
+                        elif isinstance(frame, str) and _is_segment(frame):
+                            result.segments += 1
+                            if first_audio_at is not None:
+                                replay_segments.append(time.monotonic() - first_audio_at)
+                except websockets.ConnectionClosed:
+                    # The target hung up; the sender sees it on its next
+                    # send, or below while it waits for readiness.
+                    pass
+
+            receiver = asyncio.create_task(receive())
+            # After readiness the clock restarts from it, so a slow handshake
+            # delays the audio instead of compressing it into a burst.
+            clock_origin_us, clock_start = 0, t0
+            for record in records:
+                if record.kind not in (C2S_TEXT, C2S_BINARY):
+                    continue
+                if ready_at_us is not None and record.offset_us >= ready_at_us and not ready.is_set():
+                    waiter = asyncio.create_task(ready.wait())
+                    await asyncio.wait({waiter, receiver}, timeout=PROVIDER_READY_TIMEOUT_S,
+                                       return_when=asyncio.FIRST_COMPLETED)
+                    waiter.cancel()
+                    if not ready.is_set():
+                        if receiver.done():
+                            result.error = (f"closed before dg_open: {ws.close_code} "
+                                            f"{ws.close_reason or ''}".rstrip())
+                        else:
+                            result.error = f"no dg_open within {PROVIDER_READY_TIMEOUT_S:.0f}s"
+                        break
+                    clock_origin_us, clock_start = ready_at_us, time.monotonic()
+                due = clock_start + (record.offset_us - clock_origin_us) / 1e6 * scale
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if record.kind == C2S_BINARY:
+                    if first_audio_at is None:
+                        first_audio_at = time.monotonic()
+                    await ws.send(record.payload)
+                else:
+                    await ws.send(record.payload.decode())
+                result.sent_frames += 1
+                result.sent_bytes += len(record.payload)
+
+            if result.error is None:
+                # Give the target the recording's own tail to answer the last
+                # audio, and never less than `drain_s`: at max pace that tail
+                # scales to nothing and every late answer would be counted as
+                # missing.
+                close = next((r for r in records if r.kind == CLOSE), None)
+                last_sent = max((r.offset_us for r in records if r.kind in (C2S_TEXT, C2S_BINARY)),
+                                default=0)
+                tail_s = (close.offset_us - last_sent) / 1e6 * scale if close is not None else 0.0
+                await asyncio.sleep(max(tail_s, drain_s))
+            await ws.close()
+            await asyncio.wait({receiver}, timeout=5)
+            receiver.cancel()
+    except (OSError, websockets.InvalidHandshake, websockets.ConnectionClosedError) as err:
+        result.error = str(err)
+
+    result.segment_lag_s = [
+        replayed - recorded / 1e6 * scale
+        for replayed, recorded in zip(replay_segments, recorded_segments)
+    ]
+    return result
+
+
+async def _replay(args: argparse.Namespace) -> int:
+    index = read_index(args.archive.with_name(args.archive.name + ".idx")) or reindex(args.archive)
+    chosen = [s for s in index if not args.session or s["session"] in args.session]
+    if not chosen:
+        sys.exit("no matching sessions in the archive")
+    token = args.token or os.environ.get("TAYLOS_TOKEN")
+    print(f"replaying {len(chosen)} session(s) against {args.target} at "
+          f"{'max' if args.speed == 0 else f'{args.speed:g}x'} pace")
+
+    results = await asyncio.gather(*(
+        replay_session(args.archive, info, args.target, args.speed, token, args.drain) for info in chosen
+    ))
+
+    print(f"\n  {'session':>7} {'ready':>7} {'sent':>8} {'MB':>7} {'recv':>6} "
+          f"{'segments':>11} {'lag p50':>8} {'lag max':>8}")
+    failed = 0
+    for r in results:
+        if r.error:
+            failed += 1
+            print(f"  {r.session:>7}  ERROR {r.error}")
+            continue
+        lags = sorted(r.segment_lag_s)
+        p50 = f"{lags[len(lags) // 2]:+7.2f}s" if lags else f"{'-':>8}"
+        worst = f"{lags[-1]:+7.2f}s" if lags else f"{'-':>8}"
+        ready = f"{r.ready_s:6.2f}s" if r.ready_s is not None else f"{'-':>7}"
+        print(f"  {r.session:>7} {ready} {r.sent_frames:>8} {r.sent_bytes / 1e6:7.2f} {r.received:>6} "
+              f"{r.segments:>5}/{r.recorded_segments:<5} {p50} {worst}")
+    return 1 if failed else 0
+
+
+def _ls(args: argparse.Namespace) -> int:
+    index_path = args.archive.with_name(args.archive.name + ".idx")
+    sessions = reindex(args.archive) if args.reindex or not index_path.exists() else read_index(index_path)
+    print(f"  {'session':>7} {'started':<19} {'dur':>8} {'frames':>8} {'MB':>7} {'close':>5}  path")
+    for s in sessions:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(s["started_at"]))
+        dur = f"{s['duration_s']:7.1f}s" if s.get("duration_s") is not None else "   open "
+        print(f"  {s['session']:>7} {started:<19} {dur} {s['frames']:>8} {s['bytes'] / 1e6:7.2f} "
+              f"{str(s.get('code') or '-'):>5}  {s['path']}")
+    return 0
+
+
+def _chunks(args: argparse.Namespace) -> int:
+    """Every `audio_chunk_meta` envelope the desktop sent, one JSON line each.
+
+    This is the only place the app's chunk metadata is kept, and it is what
+    `trace_events.py --chunks` reads to draw both capture streams.
+    """
+    out = args.output.open("w") if args.output else sys.stdout
+    written = 0
+    try:
+        for _, record in read_records(args.archive):
+            if record.kind != C2S_TEXT or (args.session and record.session not in args.session):
+                continue
+            try:
+                message = json.loads(record.payload)
+            except ValueError:
+                continue
+            if isinstance(message, dict) and message.get("command") == "audio_chunk_meta":
+                out.write(json.dumps(message, separators=(",", ":")) + "\n")
+                written += 1
+    finally:
+        if args.output:
+            out.close()
+    if args.output:
+        print(f"wrote {written} chunk envelopes to {args.output}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="record and replay /ws/transcribe traffic")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="run a recording proxy in front of the backend")
+    rec.add_argument("archive", type=Path)
+    rec.add_argument("--upstream", default="ws://localhost:8000")
+    rec.add_argument("--host", default="127.0.0.1")
+    rec.add_argument("--port", type=int, default=8766)
+
+    ls = sub.add_parser("ls", help="list the sessions in an archive")
+    ls.add_argument("archive", type=Path)
+    ls.add_argument("--reindex", action="store_true", help="rebuild the index from the archive")
+
+    chunks = sub.add_parser("chunks", help="extract audio_chunk_meta envelopes as JSONL")
+    chunks.add_argument("archive", type=Path)
+    chunks.add_argument("--session", type=int, action="append", default=[],
+                        help="session number from `ls` (repeatable; default all)")
+    chunks.add_argument("-o", "--output", type=Path, help="write here instead of stdout")
+
+    rep = sub.add_parser("replay", help="re-drive sessions against a target")
+    rep.add_argument("archive", type=Path)
+    rep.add_argument("--target", default="ws://127.0.0.1:8765")
+    rep.add_argument("--session", type=int, action="append", default=[],
+                     help="session number from `ls` (repeatable; default all)")
+    rep.add_argument("--speed", type=float, default=1.0,
+                     help="pacing multiplier; 0 sends as fast as the socket accepts")
+    rep.add_argument("--token", help="bearer token for the target (or $TAYLOS_TOKEN)")
+    rep.add_argument("--drain", type=float, default=1.0,
+                     help="minimum seconds to keep listening after the last frame")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "record":
+            asyncio.run(_record(args))
+            return 0
+        if args.command == "ls":
+            return _ls(args)
+        if args.command == "chunks":
+            return _chunks(args)
+        return asyncio.run(_replay(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""A local stand-in for the backend's `/ws/transcribe`.
+
+    python3 tools/ws_mock.py --port 8765
+    python3 tools/ws_mock.py --port 0 --token secret   # any free port; reject other tokens
+
+Enough of the real endpoint to drive the desktop's transport without Deepgram,
+a database or a login: it accepts the same URL, announces readiness with the
+same `status`/`dg_open` envelope the renderer waits for, consumes
+`audio_chunk_meta` + PCM pairs, and answers with a final `transcript_segment`
+for every `SEGMENT_MS` of audio received on the capture clock - shaped like
+`tests/fixtures/backend-transcript-contract.json`, so the desktop adapter
+accepts it.
+
+It exists for the traffic tools (`ws_archive.py` replays against it,
+`reconnect-storm.py` restarts it under load), which need an endpoint whose
+behaviour and timing are known. It transcribes nothing: the text is a
+placeholder, and only the identity and timing fields mean anything.
+
+Requires: websockets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import websockets
+
+SEGMENT_MS = 2_000
+
+
+def request_path(ws) -> str:
+    """Path and query of an accepted connection, across websockets API generations."""
+    request = getattr(ws, "request", None)
+    return request.path if request is not None else ws.path
+
+
+class MockTranscribeServer:
+    """Start, stop and restart a mock endpoint; counts what it saw.
+
+    `ready_delay_s` is the time between the handshake and `dg_open`, which is
+    the provider connect the real backend performs for every socket. Under a
+    reconnect storm it is the part that queues, so it is the knob that matters;
+    `provider_slots` bounds how many of those connects run at once, the way a
+    worker pool or a provider rate limit does. None means unbounded.
+
+    `received_ms` is the capture time that actually arrived, per
+    `(capture_session_id, source)`, so a client can tell what it lost.
+
+    `token`, when set, is checked against the `token` query parameter, and a
+    mismatch is closed with 1008 before `dg_open`, as the backend rejects a
+    bad JWT. Port 0 binds any free port; `port` holds the real one once
+    started, and a restart keeps it.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, ready_delay_s: float = 0.0,
+                 provider_slots: int | None = None, token: str | None = None) -> None:
+        self.host = host
+        self.port = port
+        self.ready_delay_s = ready_delay_s
+        self.provider_slots = provider_slots
+        self.token = token
+        self.handshakes = 0
+        self.handshake_times: list[float] = []
+        self.active = 0
+        self.peak_active = 0
+        self.pending = 0
+        self.peak_pending = 0
+        self.audio_bytes = 0
+        self.received_ms: dict[tuple[str, str], float] = {}
+        self._server = None
+        self._dials: set[asyncio.Task] = set()
+        self._slots = asyncio.Semaphore(provider_slots) if provider_slots else None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        self._server = await websockets.serve(self._handle, self.host, self.port, max_size=None)
+        self.port = next(iter(self._server.sockets)).getsockname()[1]
+
+    async def stop(self, code: int = 1012, reason: str = "service restart", abort: bool = False) -> None:
+        """Drop every client the way a restarting backend does, then stop listening.
+
+        `abort` drops the TCP connections without a close frame instead, which
+        is what clients see when the process is killed rather than restarted.
+        Either way the provider connects still in flight die with it, as they
+        do with a backend process, instead of holding the stop up until they
+        would have finished.
+        """
+        if self._server is None:
+            return
+        self._server.close(close_connections=False)
+        connections = list(self._server.connections)
+        if abort:
+            for ws in connections:
+                ws.transport.abort()
+        else:
+            await asyncio.gather(*(ws.close(code, reason) for ws in connections), return_exceptions=True)
+        for dial in list(self._dials):
+            dial.cancel()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def restart(self, downtime_s: float = 0.0, abort: bool = False) -> None:
+        await self.stop(abort=abort)
+        await asyncio.sleep(downtime_s)
+        await self.start()
+
+    async def _handle(self, ws) -> None:
+        self.handshakes += 1
+        self.handshake_times.append(time.monotonic())
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            await self._session(ws)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.active -= 1
+
+    async def _provider_connect(self) -> None:
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            if self._slots is None:
+                await asyncio.sleep(self.ready_delay_s)
+                return
+            async with self._slots:
+                await asyncio.sleep(self.ready_delay_s)
+        finally:
+            self.pending -= 1
+
+    async def _session(self, ws) -> None:
+        query = parse_qs(urlsplit(request_path(ws)).query)
+        source = (query.get("source") or ["mic"])[0]
+        if self.token is not None and (query.get("token") or [None])[0] != self.token:
+            await ws.close(1008, "invalid token")
+            return
+        dial = asyncio.create_task(self._provider_connect())
+        self._dials.add(dial)
+        dial.add_done_callback(self._dials.discard)
+        await asyncio.wait({dial})
+        if dial.cancelled():
+            return
+        await ws.send(json.dumps({"type": "status", "data": {"dg_open": True}}))
+
+        meta = None
+        pending: list[dict] = []
+        utterances = 0
+        async for frame in ws:
+            if isinstance(frame, str):
+                message = json.loads(frame)
+                if message.get("command") == "audio_chunk_meta":
+                    meta = message
+                continue
+            self.audio_bytes += len(frame)
+            if meta is None:
+                continue
+            pending.append(meta)
+            key = (meta["capture_session_id"], meta["source"])
+            self.received_ms[key] = self.received_ms.get(key, 0.0) + meta["capture_end_ms"] - meta["capture_start_ms"]
+            meta = None
+            if pending[-1]["capture_end_ms"] - pending[0]["capture_start_ms"] < SEGMENT_MS:
+                continue
+            utterances += 1
+            await ws.send(json.dumps(_segment(pending[0], pending[-1], source, utterances)))
+            pending = []
+
+
+def _segment(first: dict, last: dict, source: str, n: int) -> dict:
+    session = first["capture_session_id"]
+    generation = first["capture_generation"]
+    epoch = first["session_epoch_ms"]
+    start, end = first["capture_start_ms"], last["capture_end_ms"]
+    utterance_id = f"mock-{source}-{n}"
+    now = int(time.time() * 1000)
+    return {
+        "type": "transcript_segment",
+        "data": {
+            "text": f"segment {n}",
+            "speaker": 1 if source == "mic" else 0,
+            "is_final": True,
+            "is_turn_complete": True,
+            "timestamp": now / 1000,
+            "source": source,
+            "capture_session_id": session,
+            "capture_generation": generation,
+            "capture_start_ms": start,
+            "capture_end_ms": end,
+            "session_epoch_ms": epoch,
+            "stream_generation": 0,
+            "seq": n,
+            "audio_start_ms": epoch + start,
+            "audio_end_ms": epoch + end,
+            "clock_domain_valid": True,
+            "words": [
+                {"text": "segment", "start_ms": epoch + start, "end_ms": epoch + (start + end) / 2,
+                 "capture_start_ms": start, "capture_end_ms": (start + end) / 2},
+                {"text": str(n), "start_ms": epoch + (start + end) / 2, "end_ms": epoch + end,
+                 "capture_start_ms": (start + end) / 2, "capture_end_ms": end},
+            ],
+            "trace": {"provider_received_at_ms": now, "server_sent_at_ms": now,
+                      "activity_sequence": n, "audio_clock_anchored": True},
+            "utterance_id": utterance_id,
+            "event_id": f"{session}:{generation}:{source}:0:{utterance_id}",
+        },
+        "_source": source,
+    }
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = MockTranscribeServer(args.host, args.port, args.ready_delay, args.provider_slots, args.token)
+    await server.start()
+    slots = args.provider_slots or "unbounded"
+    print(f"mock /ws/transcribe on {server.url}  (ready delay {args.ready_delay:.2f}s, "
+          f"provider slots {slots})", flush=True)
+    await asyncio.Future()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="local mock of the /ws/transcribe endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ready-delay", type=float, default=0.0,
+                        help="seconds between handshake and dg_open")
+    parser.add_argument("--provider-slots", type=int, default=None,
+                        help="provider connects allowed in flight at once (default unbounded)")
+    parser.add_argument("--token", help="reject connections whose token query differs, with 1008")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())